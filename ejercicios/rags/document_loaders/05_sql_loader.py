@@ -2,8 +2,10 @@
 Ejemplo de carga de documentos desde bases de datos SQL
 """
 
-from typing import List, Any
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Any, Mapping, Optional, Sequence, Tuple, Union
 from langchain.schema import Document
+import atexit
 import sqlite3
 
 try:
@@ -13,6 +15,85 @@ except ImportError:
     HAS_SQL_LOADER = False
 
 
+# Conexiones abiertas reutilizadas entre consultas, una por base de datos
+_CONEXIONES: Dict[str, sqlite3.Connection] = {}
+
+
+def _obtener_conexion(db_path: str) -> sqlite3.Connection:
+    """
+    Obtener (o abrir y guardar) la conexión a una base de datos SQLite.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+
+    Returns:
+        Conexión reutilizable
+    """
+    conn = _CONEXIONES.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _CONEXIONES[db_path] = conn
+    return conn
+
+
+@atexit.register
+def _cerrar_conexiones() -> None:
+    """Cerrar las conexiones abiertas al salir del intérprete."""
+    for conn in _CONEXIONES.values():
+        try:
+            # Actualizar estadísticas del planificador si hace falta
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            # Base de datos bloqueada o borrada: cerrar igualmente
+            pass
+        finally:
+            conn.close()
+    _CONEXIONES.clear()
+
+
+# Caché LRU de resultados: (db_path, query, params) -> (page_content, metadata) por fila.
+# Se guardan los datos, no los Document: cada llamada recibe objetos nuevos
+_MAX_CACHE_CONSULTAS = 128
+_CACHE_CONSULTAS: "OrderedDict[Tuple[str, str, Tuple[Any, ...]], Tuple[Tuple[str, Dict[str, Any]], ...]]" = OrderedDict()
+
+
+# Columnas de cada tabla: (db_path, tabla) -> nombres de columna
+_COLUMNAS_TABLA: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+
+
+# Valores de los marcadores: secuencia para ?, diccionario para :nombre
+Parametros = Union[Sequence[Any], Mapping[str, Any]]
+
+
+def _clave_params(params: Parametros) -> Optional[Tuple[Any, ...]]:
+    """
+    Clave de caché de los parámetros de una consulta.
+
+    Un diccionario se convierte en sus pares (nombre, valor) ordenados; con
+    tuple(dict) solo quedarían los nombres y {"id": 1} y {"id": 2} chocarían.
+
+    Returns:
+        Tupla hashable, o None si algún valor no es hashable (no cachear)
+    """
+    if isinstance(params, Mapping):
+        clave = tuple(sorted(params.items()))
+    else:
+        clave = tuple(params)
+    try:
+        hash(clave)
+    except TypeError:
+        return None
+    return clave
+
+
+def limpiar_cache_consultas() -> None:
+    """Vaciar las cachés de resultados y columnas (llamar tras escribir en la base de datos)."""
+    _CACHE_CONSULTAS.clear()
+    _COLUMNAS_TABLA.clear()
+
+
 def crear_bd_ejemplo() -> str:
     """
     Crear una base de datos SQLite de ejemplo.
@@ -48,87 +129,273 @@ def crear_bd_ejemplo() -> str:
         usuarios
     )
 
+    # Índice para filtros por email y estadísticas para el planificador
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_email ON usuarios(email)")
+    cursor.execute("ANALYZE")
+
     conn.commit()
     conn.close()
 
+    # Los datos han podido cambiar: invalidar resultados cacheados
+    limpiar_cache_consultas()
+
     return db_path
 
 
-def cargar_desde_sqlite(db_path: str, query: str) -> List[Document]:
+def iter_sqlite(
+    db_path: str,
+    query: str,
+    params: Parametros = (),
+    tam_lote: int = 1000
+) -> Iterator[Document]:
+    """
+    Iterar los documentos resultantes de una consulta SQLite.
+
+    Las filas se leen por lotes con fetchmany, así que el resultado
+    nunca se materializa completo en memoria.
+
+    Args:
+        db_path: Ruta a la base de datos SQLite
+        query: Consulta SQL a ejecutar
+        params: Valores para los marcadores ? (secuencia) o :nombre (diccionario)
+        tam_lote: Filas leídas en cada llamada a fetchmany
+
+    Yields:
+        Documentos cargados
+    """
+    # Reutilizar la conexión a la base de datos
+    cursor = _obtener_conexion(db_path).cursor()
+    cursor.arraysize = tam_lote
+
+    try:
+        # Ejecutar consulta
+        cursor.execute(query, params)
+        columnas = [description[0] for description in cursor.description]
+
+        # Las columnas son fijas para todo el resultado: preparar una sola vez
+        # la plantilla "col1: {} | col2: {}" y la posición de la columna id
+        plantilla = " | ".join(
+            col.replace("{", "{{").replace("}", "}}") + ": {}" for col in columnas
+        )
+        pos_id = columnas.index("id") if "id" in columnas else None
+        meta_base = {"source": "sqlite", "database": db_path}
+
+        while True:
+            filas = cursor.fetchmany()
+            if not filas:
+                break
+
+            # Convertir a documentos
+            for fila in filas:
+                yield Document(
+                    page_content=plantilla.format(*fila),
+                    metadata={
+                        **meta_base,
+                        "id": fila[pos_id] if pos_id is not None else None
+                    }
+                )
+    finally:
+        cursor.close()
+
+
+def cargar_desde_sqlite(db_path: str, query: str, params: Parametros = ()) -> List[Document]:
     """
     Cargar documentos desde una base de datos SQLite.
 
+    Los resultados se guardan en una caché LRU por (db_path, query, params); si la
+    base de datos se modifica fuera de crear_bd_ejemplo, llama a
+    limpiar_cache_consultas().
+
     Args:
         db_path: Ruta a la base de datos SQLite
         query: Consulta SQL a ejecutar
+        params: Valores para los marcadores ? (secuencia) o :nombre (diccionario)
 
     Returns:
         Lista de documentos
     """
-    # Conectar a la base de datos
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    clave_params = _clave_params(params)
+    if clave_params is None:
+        # Parámetros no hashables: consultar sin pasar por la caché
+        return list(iter_sqlite(db_path, query, params))
+
+    clave = (db_path, query, clave_params)
+    filas = _CACHE_CONSULTAS.get(clave)
+    if filas is None:
+        filas = tuple(
+            (doc.page_content, doc.metadata) for doc in iter_sqlite(db_path, query, params)
+        )
+        _CACHE_CONSULTAS[clave] = filas
+        if len(_CACHE_CONSULTAS) > _MAX_CACHE_CONSULTAS:
+            _CACHE_CONSULTAS.popitem(last=False)
+    else:
+        _CACHE_CONSULTAS.move_to_end(clave)
 
-    # Ejecutar consulta
-    cursor.execute(query)
-    columnas = [description[0] for description in cursor.description]
-    filas = cursor.fetchall()
-    conn.close()
+    # Documentos nuevos en cada llamada: modificar uno no altera la caché
+    return [
+        Document(page_content=contenido, metadata=dict(metadata))
+        for contenido, metadata in filas
+    ]
+
+
+def _identificador(nombre: str) -> str:
+    """Entrecomillar un nombre de tabla o columna para usarlo en SQL."""
+    return '"' + nombre.replace('"', '""') + '"'
+
+
+def _identificador_tabla(tabla: str) -> str:
+    """Entrecomillar un nombre de tabla, con prefijo de esquema opcional (main.usuarios)."""
+    esquema, punto, nombre = tabla.partition(".")
+    if not punto:
+        return _identificador(tabla)
+    return f"{_identificador(esquema)}.{_identificador(nombre)}"
 
-    # Convertir a documentos
-    documents = []
-    for fila in filas:
-        # Crear diccionario de fila
-        fila_dict = dict(zip(columnas, fila))
 
-        # Crear contenido
-        contenido = " | ".join(f"{k}: {v}" for k, v in fila_dict.items())
+def _columnas_tabla(db_path: str, tabla: str) -> Tuple[str, ...]:
+    """
+    Obtener (y cachear) las columnas de una tabla con PRAGMA table_info.
+
+    Sirve también para comprobar que la tabla existe antes de interpolar
+    su nombre en SQL. Admite nombres con esquema ("main.usuarios").
+
+    Raises:
+        ValueError: Si la tabla no existe en la base de datos
+    """
+    clave = (db_path, tabla)
+    columnas = _COLUMNAS_TABLA.get(clave)
+    if columnas is None:
+        esquema, punto, nombre = tabla.partition(".")
+        pragma = (
+            f"PRAGMA {_identificador(esquema)}.table_info({_identificador(nombre)})"
+            if punto else f"PRAGMA table_info({_identificador(tabla)})"
+        )
+        try:
+            filas = _obtener_conexion(db_path).execute(pragma).fetchall()
+        except sqlite3.OperationalError:
+            # Esquema inexistente (unknown database)
+            filas = []
+        if not filas:
+            raise ValueError(f"La tabla '{tabla}' no existe en {db_path}")
+        columnas = tuple(fila[1] for fila in filas)
+        _COLUMNAS_TABLA[clave] = columnas
+    return columnas
+
+
+def _select_columnas(db_path: str, tabla: str, cols: Optional[Sequence[str]]) -> str:
+    """
+    Construir "SELECT col1, col2 FROM tabla" con columnas explícitas.
 
-        documents.append(Document(
-            page_content=contenido,
-            metadata={
-                "source": "sqlite",
-                "database": db_path,
-                "id": fila_dict.get("id")
-            }
-        ))
+    Raises:
+        ValueError: Si la tabla o alguna columna no existen
+    """
+    existentes = _columnas_tabla(db_path, tabla)
+    if cols is None:
+        cols = existentes
+    else:
+        desconocidas = [col for col in cols if col not in existentes]
+        if desconocidas:
+            raise ValueError(
+                f"Columnas inexistentes en '{tabla}': {', '.join(desconocidas)}"
+            )
 
-    return documents
+    lista = ", ".join(_identificador(col) for col in cols)
+    return f"SELECT {lista} FROM {_identificador_tabla(tabla)}"
 
 
-def cargar_tabla_completa(db_path: str, tabla: str) -> List[Document]:
+def cargar_tabla_completa(
+    db_path: str,
+    tabla: str,
+    cols: Optional[Sequence[str]] = None
+) -> List[Document]:
     """
     Cargar una tabla completa de SQLite.
 
     Args:
         db_path: Ruta a la base de datos
         tabla: Nombre de la tabla
+        cols: Columnas a cargar (default: todas, en orden de la tabla)
 
     Returns:
         Lista de documentos
     """
-    query = f"SELECT * FROM {tabla}"
+    query = _select_columnas(db_path, tabla, cols)
     return cargar_desde_sqlite(db_path, query)
 
 
-def cargar_con_filtro(db_path: str, tabla: str, condicion: str = None) -> List[Document]:
+def cargar_con_filtro(
+    db_path: str,
+    tabla: str,
+    condicion: str = None,
+    params: Parametros = (),
+    cols: Optional[Sequence[str]] = None
+) -> List[Document]:
     """
     Cargar datos de una tabla con filtro opcional.
 
+    Los valores del filtro deben pasarse con marcadores ? en la condición
+    y sus valores en params: así no hay inyección SQL y SQLite reutiliza
+    la consulta preparada aunque cambien los valores.
+
     Args:
         db_path: Ruta a la base de datos
         tabla: Nombre de la tabla
-        condicion: Condición WHERE (opcional)
+        condicion: Condición WHERE con marcadores ? (opcional)
+        params: Valores para los marcadores de la condición
+        cols: Columnas a cargar (default: todas, en orden de la tabla)
 
     Returns:
         Lista de documentos
     """
+    query = _select_columnas(db_path, tabla, cols)
     if condicion:
-        query = f"SELECT * FROM {tabla} WHERE {condicion}"
-    else:
-        query = f"SELECT * FROM {tabla}"
+        query = f"{query} WHERE {condicion}"
+
+    return cargar_desde_sqlite(db_path, query, params)
 
-    return cargar_desde_sqlite(db_path, query)
+
+def cargar_tabla_concatenada(
+    db_path: str,
+    tabla: str,
+    columnas: Sequence[str],
+    columna_id: str = "id"
+) -> List[Document]:
+    """
+    Cargar una tabla dejando que SQLite construya el contenido.
+
+    La cadena "col: valor | col: valor" se genera con printf dentro de la
+    consulta, de modo que solo se transfieren (id, contenido) por fila.
+    Los valores NULL aparecen como cadena vacía.
+
+    Args:
+        db_path: Ruta a la base de datos
+        tabla: Nombre de la tabla
+        columnas: Columnas que forman el contenido
+        columna_id: Columna usada como id en la metadata
+
+    Returns:
+        Lista de documentos
+    """
+    formato = " | ".join(col.replace("%", "%%") + ": %s" for col in columnas)
+    formato = formato.replace("'", "''")
+    argumentos = ", ".join(_identificador(col) for col in columnas)
+    query = (
+        f"SELECT {_identificador(columna_id)}, printf('{formato}', {argumentos}) "
+        f"FROM {_identificador_tabla(tabla)}"
+    )
+
+    meta_base = {"source": "sqlite", "database": db_path}
+    cursor = _obtener_conexion(db_path).cursor()
+    try:
+        cursor.execute(query)
+        return [
+            Document(
+                page_content=contenido,
+                metadata={"id": id_fila, **meta_base}
+            )
+            for id_fila, contenido in cursor
+        ]
+    finally:
+        cursor.close()
 
 
 if __name__ == "__main__":
@@ -140,8 +407,10 @@ if __name__ == "__main__":
     print("Funciones disponibles:")
     print("1. crear_bd_ejemplo() - Crea BD SQLite de ejemplo")
     print("2. cargar_desde_sqlite(db_path, query) - Carga con consulta SQL")
+    print("   iter_sqlite(db_path, query) - Versión en streaming por lotes")
     print("3. cargar_tabla_completa(db_path, tabla) - Carga tabla completa")
-    print("4. cargar_con_filtro(db_path, tabla, condicion) - Carga con filtro")
+    print("4. cargar_con_filtro(db_path, tabla, condicion, params) - Carga con filtro")
+    print("5. cargar_tabla_concatenada(db_path, tabla, columnas) - Contenido generado en SQL")
     print()
 
     # Ejemplo 1: Crear BD y cargar tabla completa
@@ -176,7 +445,8 @@ if __name__ == "__main__":
         documentos = cargar_con_filtro(
             db_path,
             "usuarios",
-            condicion="id > 1"
+            condicion="id > ?",
+            params=(1,)
         )
 
         print(f"Documentos con id > 1: {len(documentos)}\n")
@@ -206,6 +476,26 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Error: {e}\n")
 
+    # Ejemplo 4: Contenido construido por SQLite
+    print("Ejemplo 4: Contenido construido en la consulta")
+    print("-" * 60)
+
+    try:
+        db_path = crear_bd_ejemplo()
+
+        documentos = cargar_tabla_concatenada(
+            db_path,
+            "usuarios",
+            columnas=["nombre", "email"]
+        )
+
+        for doc in documentos:
+            print(f"Contenido: {doc.page_content}")
+        print()
+
+    except Exception as e:
+        print(f"Error: {e}\n")
+
     print("Ejemplo para PostgreSQL:")
     print("-" * 60)
     print("""
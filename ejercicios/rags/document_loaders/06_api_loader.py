@@ -2,121 +2,449 @@
 Ejemplo de carga de documentos desde APIs RESTful
 """
 
-from typing import List, Iterator, Optional, Dict, Any
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Iterator, Optional, Dict, Any, Tuple
 from langchain.schema import Document
+import copy
+import hashlib
+import itertools
 import json
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+# Serialización compacta: orjson si está disponible, json estándar si no
+if HAS_ORJSON:
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except orjson.JSONEncodeError:
+            # orjson no serializa enteros de más de 64 bits; json sí
+            return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+    def _dumps_lineas(objs: List[Any]) -> str:
+        # Una sola decodificación para todo el lote (formato NDJSON)
+        try:
+            return b"".join(
+                orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE) for obj in objs
+            )[:-1].decode('utf-8')
+        except orjson.JSONEncodeError:
+            return "\n".join(_dumps(obj) for obj in objs)
+else:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+    def _dumps_lineas(objs: List[Any]) -> str:
+        return "\n".join(_dumps(obj) for obj in objs)
+
+
+# Sesión HTTP compartida: mantiene las conexiones abiertas (keep-alive)
+# entre llamadas a la misma API
+_SESION = None
+
+
+def _obtener_sesion():
+    """
+    Obtener la sesión de requests compartida, creándola la primera vez.
+
+    Returns:
+        requests.Session con pool de conexiones y reintentos
+    """
+    global _SESION
+    if _SESION is None:
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util import make_headers
+            from urllib3.util.retry import Retry
+        except ImportError:
+            raise ImportError(
+                "requests no está disponible. "
+                "Instala con: pip install requests"
+            )
+
+        adaptador = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        sesion = requests.Session()
+        sesion.mount("http://", adaptador)
+        sesion.mount("https://", adaptador)
+        # Pedir JSON comprimido: gzip/deflate, y br/zstd si hay decodificador instalado
+        sesion.headers.update(make_headers(accept_encoding=True))
+        sesion.headers["Accept"] = "application/json"
+        _SESION = sesion
+    return _SESION
+
+
+# Caché de respuestas de cargar_api_simple:
+# clave -> (ETag, Last-Modified, (page_content, metadata) de cada documento).
+# Se guardan los datos, no los Document: cada 304 devuelve objetos nuevos
+_MAX_CACHE_RESPUESTAS = 64
+_CACHE_RESPUESTAS: "OrderedDict[Tuple[str, str, int], Tuple[Optional[str], Optional[str], Tuple[Tuple[str, Dict[str, Any]], ...]]]" = OrderedDict()
+
+
+def _clave_cache(url: str, headers: Dict[str, str], batch_size: int) -> Tuple[str, str, int]:
+    """
+    Construir la clave de caché de una petición.
+
+    Los headers (incluido el token) se guardan solo como hash, de modo que
+    cada credencial tiene su propia entrada sin conservar el token en claro.
+    """
+    huella = hashlib.sha256(
+        json.dumps(sorted(headers.items())).encode('utf-8')
+    ).hexdigest()
+    return (url, huella, batch_size)
+
+
+def limpiar_cache_api() -> None:
+    """Vaciar la caché de respuestas de la API."""
+    _CACHE_RESPUESTAS.clear()
+
+
+def _iter_items_json(fuente: Any, envolver_objeto: bool = True) -> Iterator[Any]:
+    """
+    Recorrer los items de una respuesta JSON a medida que se recibe (ijson).
+
+    Sigue las mismas reglas que con la respuesta ya parseada: si la raíz es
+    una lista se recorren sus elementos; si es un objeto, los de su clave
+    'items' (que se procesan en streaming) o, si no existe, los de 'data'.
+
+    Args:
+        fuente: Objeto tipo archivo con el cuerpo de la respuesta
+        envolver_objeto: Devolver el objeto raíz como único item si no
+            tiene 'items' ni 'data' (si es False no se devuelve nada)
+
+    Yields:
+        Items de la respuesta
+    """
+    eventos = ijson.parse(fuente, use_float=True)
+    primero = next(eventos, None)
+    if primero is None:
+        return
+
+    _, evento, valor = primero
+    if evento == 'start_array':
+        yield from ijson.items(itertools.chain([primero], eventos), 'item')
+        return
+    if evento != 'start_map':
+        yield valor
+        return
+
+    # Objeto raíz: construir las claves de primer nivel salvo 'items'
+    raiz: Dict[str, Any] = {}
+    for prefijo, evento, valor in eventos:
+        if evento != 'map_key' or prefijo != '':
+            continue
+
+        clave = valor
+        inicio = next(eventos)
+        if clave == 'items' and inicio[1] == 'start_array':
+            yield from ijson.items(itertools.chain([inicio], eventos), 'items.item')
+            return
+
+        constructor = ObjectBuilder()
+        constructor.event(inicio[1], inicio[2])
+        profundidad = 1 if inicio[1] in ('start_map', 'start_array') else 0
+        while profundidad:
+            _, evento, valor = next(eventos)
+            constructor.event(evento, valor)
+            if evento in ('start_map', 'start_array'):
+                profundidad += 1
+            elif evento in ('end_map', 'end_array'):
+                profundidad -= 1
+        raiz[clave] = constructor.value
+
+    yield from raiz.get('items', raiz.get('data', [raiz] if envolver_objeto else []))
+
+
+class _LecturaGrabada:
+    """Envoltorio de un archivo que guarda lo leído para poder recuperar el cuerpo entero."""
+
+    def __init__(self, fuente: Any):
+        self._fuente = fuente
+        self._leido: List[bytes] = []
+
+    def read(self, n: int = -1) -> bytes:
+        datos = self._fuente.read(n)
+        self._leido.append(datos)
+        return datos
+
+    def cuerpo_completo(self) -> bytes:
+        """Lo ya leído más lo que queda por leer de la fuente."""
+        return b"".join(self._leido) + self._fuente.read()
+
+
+def _items_respuesta(response: Any, envolver_objeto: bool = True) -> List[Any]:
+    """
+    Items de una respuesta JSON abierta con stream=True, parseados con ijson.
+
+    Si ijson no puede con el cuerpo (su backend en C no admite enteros de
+    más de 64 bits: "integer overflow") se parsea el cuerpo completo con
+    json.loads, con las mismas reglas que _iter_items_json. Se usa json y no
+    _loads porque orjson convierte esos enteros a float y pierde precisión.
+
+    Args:
+        response: Respuesta de requests pedida con stream=True
+        envolver_objeto: Ver _iter_items_json
+
+    Returns:
+        Items de la respuesta
+    """
+    response.raw.decode_content = True
+    fuente = _LecturaGrabada(response.raw)
+    try:
+        return list(_iter_items_json(fuente, envolver_objeto))
+    except ijson.JSONError:
+        data = json.loads(fuente.cuerpo_completo())
+
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return [data]
+    return data.get('items', data.get('data', [data] if envolver_objeto else []))
+
 
 class APIDocumentLoader:
     """
     Loader personalizado para cargar documentos desde APIs RESTful.
     """
 
-    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None):
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        session=None
+    ):
         """
         Inicializar el loader.
 
         Args:
             base_url: URL base de la API
             headers: Headers HTTP (opcional)
+            session: Sesión de requests (opcional, por defecto la compartida)
         """
         self.base_url = base_url
-        self.headers = headers or {}
+        self.headers = {"Accept": "application/json", **(headers or {})}
+        self.session = session
+
+    def _fetch_page(self, page: int, page_size: int) -> List[Dict[str, Any]]:
+        """
+        Descargar una página de la API.
+
+        Args:
+            page: Número de página (empezando en 1)
+            page_size: Tamaño de página
 
-    def load(self, page_size: int = 10) -> Iterator[Document]:
+        Returns:
+            Items de la página (lista vacía si no hay más)
+        """
+        session = self.session or _obtener_sesion()
+        response = session.get(
+            f"{self.base_url}?page={page}&limit={page_size}",
+            headers=self.headers,
+            timeout=10,
+            stream=HAS_IJSON
+        )
+        try:
+            response.raise_for_status()
+
+            # Asumir estructura {items: [...]}
+            if HAS_IJSON:
+                # Parsear mientras se recibe, sin guardar antes el cuerpo entero
+                return _items_respuesta(response, envolver_objeto=False)
+
+            data = _loads(response.content)
+            return data.get('items', data.get('data', []))
+        finally:
+            response.close()
+
+    def load(self, page_size: int = 10, prefetch: int = 4) -> Iterator[Document]:
         """
         Cargar documentos con paginación.
 
+        Mientras se procesan los items de una página, las siguientes
+        `prefetch` páginas se van descargando en segundo plano.
+
         Args:
             page_size: Tamaño de página
+            prefetch: Páginas pedidas por adelantado (1 = secuencial)
 
         Yields:
             Documentos cargados
         """
-        try:
-            import requests
-        except ImportError:
-            raise ImportError(
-                "requests no está disponible. "
-                "Instala con: pip install requests"
+        if self.session is None:
+            # Falla aquí (y no en un hilo) si requests no está instalado
+            self.session = _obtener_sesion()
+
+        meta_base = {"source": "api", "url": self.base_url}
+        executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+        pendientes = deque()
+        siguiente = 1
+
+        def pedir_pagina() -> None:
+            nonlocal siguiente
+            pendientes.append(
+                (siguiente, executor.submit(self._fetch_page, siguiente, page_size))
             )
+            siguiente += 1
 
-        page = 1
-        while True:
-            try:
-                response = requests.get(
-                    f"{self.base_url}?page={page}&limit={page_size}",
-                    headers=self.headers,
-                    timeout=10
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                # Asumir estructura {items: [...]}
-                items = data.get('items', data.get('data', []))
+        try:
+            for _ in range(max(1, prefetch)):
+                pedir_pagina()
+
+            while pendientes:
+                page, futuro = pendientes.popleft()
+                try:
+                    items = futuro.result()
+                except Exception as e:
+                    print(f"Error al cargar página {page}: {e}")
+                    break
 
                 if not items:
                     break
 
-                for item in items:
-                    yield Document(
-                        page_content=json.dumps(item, ensure_ascii=False),
-                        metadata={
-                            "source": "api",
-                            "url": self.base_url,
-                            "id": item.get("id"),
-                            "page": page
-                        }
-                    )
-
-                page += 1
-
-            except Exception as e:
-                print(f"Error al cargar página {page}: {e}")
-                break
+                # Mantener la ventana llena antes de procesar esta página
+                pedir_pagina()
+
+                # Mismo tratamiento de errores que la descarga: un item
+                # inválido (p. ej. que no es un objeto) termina la carga
+                try:
+                    for item in items:
+                        yield Document(
+                            page_content=_dumps(item),
+                            metadata={**meta_base, "id": item.get("id"), "page": page}
+                        )
+                except Exception as e:
+                    print(f"Error al cargar página {page}: {e}")
+                    break
+        finally:
+            # No esperar a las páginas pedidas de más tras la última
+            executor.shutdown(wait=False, cancel_futures=True)
 
 
-def cargar_api_simple(url: str, headers: Optional[Dict[str, str]] = None) -> List[Document]:
+def cargar_api_simple(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    batch_size: int = 1
+) -> List[Document]:
     """
     Cargar documentos desde una API simple (sin paginación).
 
+    Con batch_size > 1 se agrupan varios items por documento (un JSON por
+    línea), lo que reduce el número de documentos a embeber cuando los
+    items son pequeños. En ese caso la metadata lleva "ids" en lugar de "id".
+
+    Si el servidor devuelve ETag o Last-Modified, los documentos se guardan
+    en caché y las siguientes llamadas envían If-None-Match /
+    If-Modified-Since: ante un 304 se reutilizan sin descargar el cuerpo.
+
     Args:
         url: URL de la API
         headers: Headers HTTP (opcional)
+        batch_size: Items por documento (default: 1)
 
     Returns:
         Lista de documentos
     """
+    headers = headers or {}
+    clave = _clave_cache(url, headers, batch_size)
+    cacheada = _CACHE_RESPUESTAS.get(clave)
+
+    cabeceras = dict(headers)
+    if cacheada is not None:
+        etag, modificado, _ = cacheada
+        if etag:
+            cabeceras["If-None-Match"] = etag
+        if modificado:
+            cabeceras["If-Modified-Since"] = modificado
+
+    response = _obtener_sesion().get(
+        url, headers=cabeceras, timeout=10, stream=HAS_IJSON
+    )
     try:
-        import requests
-    except ImportError:
-        raise ImportError(
-            "requests no está disponible. "
-            "Instala con: pip install requests"
+        if cacheada is not None and response.status_code == 304:
+            # Sin cambios en el servidor: reconstruir los documentos cacheados
+            # (copia profunda: la metadata puede llevar la lista "ids")
+            _CACHE_RESPUESTAS.move_to_end(clave)
+            return [
+                Document(page_content=contenido, metadata=copy.deepcopy(metadata))
+                for contenido, metadata in cacheada[2]
+            ]
+
+        response.raise_for_status()
+
+        if HAS_IJSON:
+            # Parsear los items a medida que llegan, sin cargar antes todo el cuerpo
+            items = _items_respuesta(response)
+        else:
+            data = _loads(response.content)
+
+            # Manejar respuesta como lista
+            if isinstance(data, list):
+                items = data
+            else:
+                # Manejar respuesta como objeto con items
+                items = data.get('items', data.get('data', [data]))
+
+        documents = []
+        meta_base = {"source": "api", "url": url}
+        if batch_size <= 1:
+            for item in items:
+                documents.append(Document(
+                    page_content=_dumps(item),
+                    metadata={
+                        **meta_base,
+                        "id": item.get("id") if isinstance(item, dict) else None
+                    }
+                ))
+        else:
+            items = iter(items)
+            while True:
+                lote = list(itertools.islice(items, batch_size))
+                if not lote:
+                    break
+                documents.append(Document(
+                    page_content=_dumps_lineas(lote),
+                    metadata={
+                        **meta_base,
+                        "ids": [
+                            item.get("id") if isinstance(item, dict) else None
+                            for item in lote
+                        ]
+                    }
+                ))
+    finally:
+        response.close()
+
+    etag = response.headers.get("ETag")
+    modificado = response.headers.get("Last-Modified")
+    if etag or modificado:
+        _CACHE_RESPUESTAS[clave] = (
+            etag,
+            modificado,
+            tuple((doc.page_content, copy.deepcopy(doc.metadata)) for doc in documents)
         )
-
-    response = requests.get(url, headers=headers or {}, timeout=10)
-    response.raise_for_status()
-    data = response.json()
-
-    documents = []
-
-    # Manejar respuesta como lista
-    if isinstance(data, list):
-        items = data
-    else:
-        # Manejar respuesta como objeto con items
-        items = data.get('items', data.get('data', [data]))
-
-    for item in items:
-        documents.append(Document(
-            page_content=json.dumps(item, ensure_ascii=False),
-            metadata={
-                "source": "api",
-                "url": url,
-                "id": item.get("id") if isinstance(item, dict) else None
-            }
-        ))
+        _CACHE_RESPUESTAS.move_to_end(clave)
+        if len(_CACHE_RESPUESTAS) > _MAX_CACHE_RESPUESTAS:
+            _CACHE_RESPUESTAS.popitem(last=False)
 
     return documents
 
@@ -124,7 +452,8 @@ def cargar_api_simple(url: str, headers: Optional[Dict[str, str]] = None) -> Lis
 def cargar_api_con_autenticacion(
     url: str,
     token: str,
-    token_type: str = "Bearer"
+    token_type: str = "Bearer",
+    batch_size: int = 1
 ) -> List[Document]:
     """
     Cargar documentos desde una API con autenticación.
@@ -133,6 +462,7 @@ def cargar_api_con_autenticacion(
         url: URL de la API
         token: Token de autenticación
         token_type: Tipo de token (default: Bearer)
+        batch_size: Items por documento (default: 1)
 
     Returns:
         Lista de documentos
@@ -141,7 +471,7 @@ def cargar_api_con_autenticacion(
         "Authorization": f"{token_type} {token}",
         "Content-Type": "application/json"
     }
-    return cargar_api_simple(url, headers)
+    return cargar_api_simple(url, headers, batch_size)
 
 
 def transformar_items_api(items: List[Dict[str, Any]], campos: List[str]) -> str:
@@ -215,8 +545,8 @@ loader = APIDocumentLoader(
     headers={"Authorization": "Bearer tu_token"}
 )
 
-# Cargar con página size de 20
-for document in loader.load(page_size=20):
+# Cargar con página size de 20, pidiendo 4 páginas por adelantado
+for document in loader.load(page_size=20, prefetch=4):
     print(f"ID: {document.metadata['id']}")
     print(f"Página: {document.metadata['page']}")
     print(f"Contenido: {document.page_content[:100]}...")
@@ -245,9 +575,10 @@ for doc in documentos:
     print("-" * 60)
 
     try:
-        import requests
-
-        response = requests.get("https://jsonplaceholder.typicode.com/users?_limit=2")
+        response = _obtener_sesion().get(
+            "https://jsonplaceholder.typicode.com/users?_limit=2",
+            timeout=10
+        )
         usuarios = response.json()
 
         # Transformar extrayendo campos específicos
@@ -3,46 +3,215 @@ Ejemplo de carga de documentos desde archivos JSON (.json)
 """
 
 import json
-from typing import List, Dict, Any
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List, Union
 from langchain.schema import Document
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-def cargar_json_simple(ruta_archivo: str) -> List[Document]:
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+# Serialización compacta: orjson si está disponible, json estándar si no
+if HAS_ORJSON:
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+
+    def _loads_buffer(buffer: mmap.mmap) -> Any:
+        # orjson lee directamente de la memoria mapeada, sin copiarla
+        with memoryview(buffer) as vista:
+            return orjson.loads(vista)
+else:
+    _loads = json.loads
+
+    def _loads_buffer(buffer: mmap.mmap) -> Any:
+        return json.loads(buffer[:])
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+# Metadata común a todos los elementos de una lista JSON
+_META_ITEM_JSON = {"source": "json", "type": "item"}
+
+
+def _serializar(obj: Any, pretty: bool = False) -> str:
+    """Serializar en formato compacto, o indentado si se pide (depuración)."""
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return _dumps(obj)
+
+
+def _documento_item_json(item: Any, pretty: bool = False) -> Document:
+    """Crear el documento de un elemento de una lista JSON."""
+    return Document(
+        page_content=_serializar(item, pretty),
+        metadata={
+            **_META_ITEM_JSON,
+            "id": item.get("id") if isinstance(item, dict) else None
+        }
+    )
+
+
+def _es_lista_json(f: Union[BinaryIO, mmap.mmap]) -> bool:
+    """Comprobar si el primer valor del archivo es una lista, sin consumirlo."""
+    caracter = f.read(1)
+    while caracter and caracter.isspace():
+        caracter = f.read(1)
+    f.seek(0)
+    return caracter == b'['
+
+
+def iter_json_simple(ruta_archivo: str, pretty: bool = False) -> Iterator[Document]:
     """
-    Cargar documentos desde un archivo JSON.
+    Iterar los documentos de un archivo JSON.
+
+    El archivo se mapea en memoria (mmap), así que el sistema operativo
+    carga las páginas bajo demanda en lugar de copiar todo el contenido.
+    Si es una lista y ijson está instalado, los elementos se leen de uno
+    en uno sin construir la lista completa.
 
     Args:
         ruta_archivo: Ruta al archivo JSON
+        pretty: Indentar el JSON del contenido (solo para depuración)
 
-    Returns:
-        Lista de documentos
+    Yields:
+        Documentos cargados
     """
-    with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        datos = json.load(f)
+    with open(ruta_archivo, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap no admite archivos vacíos; el parser dará el error habitual
+            datos = _loads(f.read())
+        else:
+            if hasattr(os, 'posix_fadvise'):
+                # Avisar al sistema de que la lectura será secuencial
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
 
-    documents = []
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if HAS_IJSON and _es_lista_json(mm):
+                    for item in ijson.items(mm, 'item', use_float=True):
+                        yield _documento_item_json(item, pretty)
+                    return
+
+                datos = _loads_buffer(mm)
+            finally:
+                mm.close()
 
     if isinstance(datos, list):
         # Si es una lista, cada elemento es un documento
         for item in datos:
-            documents.append(Document(
-                page_content=json.dumps(item, ensure_ascii=False, indent=2),
-                metadata={
-                    "source": "json",
-                    "type": "item",
-                    "id": item.get("id") if isinstance(item, dict) else None
-                }
-            ))
+            yield _documento_item_json(item, pretty)
     else:
         # Si es un objeto, todo el contenido es un documento
-        documents.append(Document(
-            page_content=json.dumps(datos, ensure_ascii=False, indent=2),
+        yield Document(
+            page_content=_serializar(datos, pretty),
             metadata={"source": "json", "type": "object"}
-        ))
+        )
+
+
+def cargar_json_simple(ruta_archivo: str, pretty: bool = False) -> List[Document]:
+    """
+    Cargar documentos desde un archivo JSON.
+
+    El contenido se serializa en formato compacto: la indentación no
+    aporta nada a los embeddings y duplica el tamaño del texto.
+
+    Args:
+        ruta_archivo: Ruta al archivo JSON
+        pretty: Indentar el JSON del contenido (solo para depuración)
+
+    Returns:
+        Lista de documentos
+    """
+    return list(iter_json_simple(ruta_archivo, pretty))
+
+
+def cargar_json_batch(
+    rutas: List[str],
+    workers: int = None,
+    pretty: bool = False
+) -> List[Document]:
+    """
+    Cargar varios archivos JSON en paralelo, uno por proceso.
+
+    El parseo es CPU y está limitado por el GIL, así que se reparte entre
+    procesos. Los documentos se devuelven en el mismo orden que las rutas.
+
+    Args:
+        rutas: Rutas a los archivos JSON
+        workers: Número de procesos (default: número de CPUs)
+        pretty: Indentar el JSON del contenido (solo para depuración)
+
+    Returns:
+        Lista de documentos de todos los archivos
+    """
+    workers = workers or os.cpu_count() or 1
+    documents = []
+
+    if workers == 1 or len(rutas) <= 1:
+        # No compensa arrancar procesos
+        for ruta in rutas:
+            documents.extend(cargar_json_simple(ruta, pretty))
+        return documents
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(rutas))) as executor:
+        for docs in executor.map(
+            cargar_json_simple, rutas, [pretty] * len(rutas), chunksize=4
+        ):
+            documents.extend(docs)
 
     return documents
 
 
+def iter_jsonl(ruta_archivo: str) -> Iterator[Document]:
+    """
+    Iterar los documentos de un archivo JSONL (JSON Lines).
+
+    Procesa una línea cada vez, por lo que la memoria usada no depende
+    del tamaño del archivo.
+
+    Args:
+        ruta_archivo: Ruta al archivo JSONL
+
+    Yields:
+        Documentos cargados
+    """
+    meta_base = {"source": "jsonl"}
+
+    # Leer en binario: orjson (y json) aceptan bytes sin decodificar antes
+    with open(ruta_archivo, 'rb') as f:
+        for num_linea, linea in enumerate(f, 1):
+            if linea.isspace():
+                continue
+            try:
+                item = _loads(linea)
+            except json.JSONDecodeError as e:
+                print(f"Error en línea {num_linea}: {e}")
+                continue
+
+            yield Document(
+                page_content=_dumps(item),
+                metadata={
+                    **meta_base,
+                    "line": num_linea,
+                    "id": item.get("id") if isinstance(item, dict) else None
+                }
+            )
+
+
 def cargar_jsonl(ruta_archivo: str) -> List[Document]:
     """
     Cargar documentos desde un archivo JSONL (JSON Lines).
@@ -55,25 +224,7 @@ def cargar_jsonl(ruta_archivo: str) -> List[Document]:
     Returns:
         Lista de documentos
     """
-    documents = []
-
-    with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        for num_linea, linea in enumerate(f, 1):
-            if linea.strip():
-                try:
-                    item = json.loads(linea)
-                    documents.append(Document(
-                        page_content=json.dumps(item, ensure_ascii=False),
-                        metadata={
-                            "source": "jsonl",
-                            "line": num_linea,
-                            "id": item.get("id") if isinstance(item, dict) else None
-                        }
-                    ))
-                except json.JSONDecodeError as e:
-                    print(f"Error en línea {num_linea}: {e}")
-
-    return documents
+    return list(iter_jsonl(ruta_archivo))
 
 
 def cargar_json_anidado(
@@ -202,6 +353,8 @@ if __name__ == "__main__":
     print("Funciones disponibles:")
     print("1. cargar_json_simple(ruta) - Carga JSON simple")
     print("2. cargar_jsonl(ruta) - Carga JSONL (JSON Lines)")
+    print("   iter_json_simple(ruta) / iter_jsonl(ruta) - Versiones en streaming")
+    print("   cargar_json_batch(rutas) - Carga varios JSON en paralelo")
     print("3. cargar_json_anidado(ruta, clave_contenido) - Carga JSON anidado")
     print("4. extraer_campo(ruta, campo) - Extrae un campo específico")
     print("5. fusionar_campos(ruta, campos) - Fusiona múltiples campos")
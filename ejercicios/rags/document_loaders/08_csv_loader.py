@@ -3,7 +3,8 @@ Ejemplo de carga de documentos desde archivos CSV (.csv)
 """
 
 import csv
-from typing import List, Optional
+import itertools
+from typing import Dict, Iterator, List, Optional, Tuple
 from langchain.schema import Document
 
 try:
@@ -12,46 +13,271 @@ try:
 except ImportError:
     HAS_PANDAS = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pacsv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
-def cargar_csv_simple(
+
+def _abrir_csv_arrow(
+    ruta_archivo: str,
+    delimitador: str = ",",
+    columnas: Optional[List[str]] = None
+):
+    """
+    Abrir un CSV con el lector en streaming de pyarrow, con columnas de texto.
+
+    El archivo se lee por bloques al recorrer el lector, así que la memoria
+    no depende del tamaño del CSV.
+
+    Args:
+        ruta_archivo: Ruta al archivo CSV
+        delimitador: Delimitador del CSV
+        columnas: Leer solo estas columnas (y "id" si existe). Si alguna
+            no está en la cabecera se leen todas (opcional)
+
+    Returns:
+        Lector de pyarrow (iterable de RecordBatch), o None si pyarrow no
+        está disponible o el CSV no es regular (cabecera repetida o que
+        pyarrow no interpreta igual) y hay que leerlo con el módulo csv
+    """
+    if not HAS_PYARROW:
+        return None
+
+    with open(ruta_archivo, 'r', encoding='utf-8', newline='') as f:
+        cabecera = next(csv.reader(f, delimiter=delimitador), None)
+    if not cabecera or len(set(cabecera)) != len(cabecera):
+        return None
+
+    # Proyección: no convertir columnas que no se van a usar
+    esperadas = cabecera
+    if columnas is not None and all(col in cabecera for col in columnas):
+        pedidas = set(columnas) | {"id"}
+        seleccion = [col for col in cabecera if col in pedidas]
+        if seleccion:
+            esperadas = seleccion
+
+    try:
+        lector = pacsv.open_csv(
+            ruta_archivo,
+            parse_options=pacsv.ParseOptions(
+                delimiter=delimitador,
+                newlines_in_values=True
+            ),
+            # Todo como texto, igual que csv.DictReader
+            convert_options=pacsv.ConvertOptions(
+                column_types={col: pa.string() for col in esperadas},
+                include_columns=esperadas
+            )
+        )
+    except pa.ArrowException:
+        return None
+
+    if lector.schema.names != esperadas:
+        lector.close()
+        return None
+    return lector
+
+
+def _lotes_arrow(lector, tam_lote: int) -> Iterator:
+    """
+    Recorrer los bloques del lector en lotes de como mucho tam_lote filas.
+
+    Puede lanzar pa.ArrowException a mitad del archivo si encuentra una
+    fila irregular (distinto número de campos).
+
+    Args:
+        lector: Lector de _abrir_csv_arrow
+        tam_lote: Filas máximas por lote
+
+    Yields:
+        RecordBatch de pyarrow
+    """
+    for bloque in lector:
+        for inicio in range(0, bloque.num_rows, tam_lote):
+            yield bloque.slice(inicio, tam_lote)
+
+
+def _filas_csv(lector, saltar: int) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Numerar las filas no vacías de csv.reader, empezando tras `saltar` filas.
+
+    Args:
+        lector: csv.reader ya situado tras la cabecera
+        saltar: Filas ya emitidas por pyarrow antes de pasar al módulo csv
+
+    Yields:
+        Pares (número de fila, fila)
+    """
+    # filter(None, ...) salta las líneas vacías, como DictReader y pyarrow
+    return enumerate(itertools.islice(filter(None, lector), saltar, None), saltar + 1)
+
+
+def _unir_columnas_arrow(tabla, columnas: List[str], separador: str = " | ") -> List[str]:
+    """
+    Construir "col: valor" unidos por separador para cada fila de la tabla.
+
+    Args:
+        tabla: Tabla de pyarrow
+        columnas: Columnas a incluir, en orden
+        separador: Separador entre columnas
+
+    Returns:
+        Lista con el contenido de cada fila
+    """
+    if not columnas:
+        return [""] * tabla.num_rows
+
+    partes = [
+        pc.binary_join_element_wise(f"{col}: ", tabla.column(col), "")
+        for col in columnas
+    ]
+    return pc.binary_join_element_wise(*partes, separador).to_pylist()
+
+
+def _posiciones_csv(cabecera: List[str]) -> Dict[str, int]:
+    """
+    Posición de cada columna en las filas de csv.reader.
+
+    El orden es el de csv.DictReader y, con nombres repetidos, gana la
+    última posición, igual que en el dict que construye DictReader.
+
+    Args:
+        cabecera: Primera fila del CSV
+
+    Returns:
+        Diccionario columna -> índice
+    """
+    return {col: i for i, col in enumerate(cabecera)}
+
+
+def _valor_csv(fila: List[str], indice: int) -> Optional[str]:
+    """Valor de la fila en `indice`; None si la fila es más corta (como DictReader)."""
+    return fila[indice] if indice < len(fila) else None
+
+
+def _unir_fila_csv(
+    campos: List[Tuple[str, int]],
+    n_campos: int,
+    fila: List[str]
+) -> str:
+    """
+    Unir "col: valor" de una fila de csv.reader como con csv.DictReader.
+
+    Args:
+        campos: Pares (columna, índice) de _posiciones_csv
+        n_campos: Número de columnas de la cabecera
+        fila: Fila leída con csv.reader
+
+    Returns:
+        Contenido de la fila; los campos sobrantes van bajo la clave None
+    """
+    partes = [f"{col}: {_valor_csv(fila, i)}" for col, i in campos]
+    if len(fila) > n_campos:
+        partes.append(f"None: {fila[n_campos:]}")
+    return " | ".join(partes)
+
+
+def iter_csv_simple(
     ruta_archivo: str,
     columna_contenido: Optional[str] = None,
-    delimitador: str = ","
-) -> List[Document]:
+    delimitador: str = ",",
+    tam_lote: int = 1000
+) -> Iterator[Document]:
     """
-    Cargar documentos desde un archivo CSV usando csv module.
+    Iterar los documentos de un archivo CSV, uno por fila.
+
+    Usa el lector de pyarrow si está instalado y el módulo csv si no. Los
+    documentos se crean por lotes de filas, así que nunca están todos en
+    memoria a la vez.
 
     Args:
         ruta_archivo: Ruta al archivo CSV
         columna_contenido: Columna a usar como contenido (opcional)
         delimitador: Delimitador del CSV (default: ",")
+        tam_lote: Filas convertidas a documentos en cada lote
 
-    Returns:
-        Lista de documentos
+    Yields:
+        Documentos cargados
     """
-    documents = []
+    meta_base = {"source": "csv", "filename": ruta_archivo}
+
+    num_fila = 0
+    lector_arrow = _abrir_csv_arrow(ruta_archivo, delimitador)
+    if lector_arrow is not None:
+        with lector_arrow:
+            columnas = lector_arrow.schema.names
+            try:
+                for lote in _lotes_arrow(lector_arrow, tam_lote):
+                    if columna_contenido and columna_contenido in columnas:
+                        contenidos = lote.column(columna_contenido).to_pylist()
+                    else:
+                        contenidos = _unir_columnas_arrow(lote, columnas)
+                    filas = range(num_fila + 1, num_fila + lote.num_rows + 1)
+                    if "id" in columnas:
+                        ids = lote.column("id").to_pylist()
+                    else:
+                        ids = [f"row_{n}" for n in filas]
+                    num_fila += lote.num_rows
+
+                    yield from (
+                        Document(
+                            page_content=contenido,
+                            metadata={**meta_base, "row": n, "id": id_fila}
+                        )
+                        for contenido, n, id_fila in zip(contenidos, filas, ids)
+                    )
+                return
+            except pa.ArrowException:
+                # Fila irregular más adelante: seguir con el módulo csv
+                pass
 
     with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        lector = csv.DictReader(f, delimiter=delimitador)
-
-        for num_fila, fila in enumerate(lector, 1):
+        # csv.reader + índices de columna: sin un dict por fila
+        lector = csv.reader(f, delimiter=delimitador)
+        cabecera = next(lector, [])
+        posiciones = _posiciones_csv(cabecera)
+        campos = list(posiciones.items())
+        i_contenido = posiciones.get(columna_contenido) if columna_contenido else None
+        i_id = posiciones.get("id")
+
+        def _contenido(fila):
             # Usar columna específica o todas las columnas
-            if columna_contenido and columna_contenido in fila:
-                contenido = fila[columna_contenido]
-            else:
-                contenido = " | ".join(f"{k}: {v}" for k, v in fila.items())
+            if i_contenido is not None:
+                return _valor_csv(fila, i_contenido)
+            return _unir_fila_csv(campos, len(cabecera), fila)
 
-            documents.append(Document(
-                page_content=contenido,
+        for num_fila, fila in _filas_csv(lector, num_fila):
+            yield Document(
+                page_content=_contenido(fila),
                 metadata={
-                    "source": "csv",
-                    "filename": ruta_archivo,
+                    **meta_base,
                     "row": num_fila,
-                    "id": fila.get("id", f"row_{num_fila}")
+                    "id": _valor_csv(fila, i_id) if i_id is not None else f"row_{num_fila}"
                 }
-            ))
+            )
+
+
+def cargar_csv_simple(
+    ruta_archivo: str,
+    columna_contenido: Optional[str] = None,
+    delimitador: str = ","
+) -> List[Document]:
+    """
+    Cargar documentos desde un archivo CSV.
 
-    return documents
+    Args:
+        ruta_archivo: Ruta al archivo CSV
+        columna_contenido: Columna a usar como contenido (opcional)
+        delimitador: Delimitador del CSV (default: ",")
+
+    Returns:
+        Lista de documentos
+    """
+    return list(iter_csv_simple(ruta_archivo, columna_contenido, delimitador))
 
 
 def cargar_csv_pandas(
@@ -75,25 +301,97 @@ def cargar_csv_pandas(
         )
 
     df = pd.read_csv(ruta_archivo)
-    documents = []
 
-    for idx, fila in df.iterrows():
-        if columna_contenido and columna_contenido in fila.index:
-            contenido = str(fila[columna_contenido])
-        else:
-            contenido = fila.to_string()
+    # Construir el contenido por columnas en lugar de fila a fila. map(str)
+    # da cadenas de longitud variable (no arrays <U del ancho de la celda
+    # más larga) y convierte los vacíos en "nan"
+    if columna_contenido and columna_contenido in df.columns:
+        contenidos = df[columna_contenido].map(str).tolist()
+    else:
+        partes = [f"{col}: " + df[col].map(str) for col in df.columns]
+        contenidos = partes[0].str.cat(partes[1:], sep=" | ").tolist()
+
+    filas = df.index.tolist()
+    ids = df["id"].tolist() if "id" in df.columns else filas
 
-        documents.append(Document(
+    return [
+        Document(
             page_content=contenido,
             metadata={
                 "source": "csv",
                 "row": idx,
                 "filename": ruta_archivo,
-                "id": fila.get("id") if "id" in fila.index else idx
+                "id": id_fila
             }
-        ))
+        )
+        for contenido, idx, id_fila in zip(contenidos, filas, ids)
+    ]
+
+
+def iter_csv_multicolumna(
+    ruta_archivo: str,
+    columnas_contenido: List[str],
+    separador: str = " | ",
+    tam_lote: int = 1000
+) -> Iterator[Document]:
+    """
+    Iterar documentos de un CSV combinando múltiples columnas como contenido.
+
+    Args:
+        ruta_archivo: Ruta al archivo CSV
+        columnas_contenido: Columnas a combinar
+        separador: Separador entre columnas
+        tam_lote: Filas convertidas a documentos en cada lote
 
-    return documents
+    Yields:
+        Documentos cargados
+    """
+    meta_base = {"source": "csv"}
+
+    num_fila = 0
+    lector_arrow = _abrir_csv_arrow(ruta_archivo, columnas=columnas_contenido)
+    if lector_arrow is not None:
+        with lector_arrow:
+            columnas = lector_arrow.schema.names
+            presentes = [col for col in columnas_contenido if col in columnas]
+            try:
+                for lote in _lotes_arrow(lector_arrow, tam_lote):
+                    contenidos = _unir_columnas_arrow(lote, presentes, separador)
+                    filas = range(num_fila + 1, num_fila + lote.num_rows + 1)
+                    if "id" in columnas:
+                        ids = lote.column("id").to_pylist()
+                    else:
+                        ids = [f"row_{n}" for n in filas]
+                    num_fila += lote.num_rows
+
+                    yield from (
+                        Document(
+                            page_content=contenido,
+                            metadata={**meta_base, "row": n, "id": id_fila}
+                        )
+                        for contenido, n, id_fila in zip(contenidos, filas, ids)
+                    )
+                return
+            except pa.ArrowException:
+                # Fila irregular más adelante: seguir con el módulo csv
+                pass
+
+    with open(ruta_archivo, 'r', encoding='utf-8') as f:
+        lector = csv.reader(f)
+        posiciones = _posiciones_csv(next(lector, []))
+        campos = [(col, posiciones[col]) for col in columnas_contenido if col in posiciones]
+        i_id = posiciones.get("id")
+
+        for num_fila, fila in _filas_csv(lector, num_fila):
+            yield Document(
+                # Combinar columnas especificadas
+                page_content=separador.join(f"{col}: {_valor_csv(fila, i)}" for col, i in campos),
+                metadata={
+                    **meta_base,
+                    "row": num_fila,
+                    "id": _valor_csv(fila, i_id) if i_id is not None else f"row_{num_fila}"
+                }
+            )
 
 
 def cargar_csv_multicolumna(
@@ -112,28 +410,105 @@ def cargar_csv_multicolumna(
     Returns:
         Lista de documentos
     """
-    documents = []
+    return list(iter_csv_multicolumna(ruta_archivo, columnas_contenido, separador))
+
+
+def iter_csv_filtrado(
+    ruta_archivo: str,
+    columna_filtro: str,
+    valor_filtro: str,
+    columna_contenido: Optional[str] = None,
+    tam_lote: int = 1000
+) -> Iterator[Document]:
+    """
+    Iterar los documentos de un CSV filtrando por una columna específica.
+
+    Args:
+        ruta_archivo: Ruta al archivo CSV
+        columna_filtro: Columna para filtrar
+        valor_filtro: Valor a buscar
+        columna_contenido: Columna a usar como contenido
+        tam_lote: Filas convertidas a documentos en cada lote
+
+    Yields:
+        Documentos cargados
+    """
+    meta_base = {"source": "csv"}
+    filtro = f"{columna_filtro}={valor_filtro}"
+
+    num_fila = 0
+    columnas = [columna_filtro, columna_contenido] if columna_contenido else None
+    lector_arrow = _abrir_csv_arrow(ruta_archivo, columnas=columnas)
+    if lector_arrow is not None:
+        with lector_arrow:
+            columnas = lector_arrow.schema.names
+            if columna_filtro not in columnas:
+                return
+
+            try:
+                for lote in _lotes_arrow(lector_arrow, tam_lote):
+                    # Filtrar el lote de forma vectorizada; el número de fila
+                    # original es el desplazamiento acumulado más el índice
+                    indices = pc.indices_nonzero(
+                        pc.equal(lote.column(columna_filtro), valor_filtro)
+                    )
+                    filas = [num_fila + idx + 1 for idx in indices.to_pylist()]
+                    num_fila += lote.num_rows
+                    if not filas:
+                        continue
+
+                    lote = lote.take(indices)
+                    if columna_contenido and columna_contenido in columnas:
+                        contenidos = lote.column(columna_contenido).to_pylist()
+                    else:
+                        contenidos = _unir_columnas_arrow(lote, columnas)
+                    if "id" in columnas:
+                        ids = lote.column("id").to_pylist()
+                    else:
+                        ids = [None] * lote.num_rows
+
+                    yield from (
+                        Document(
+                            page_content=contenido,
+                            metadata={**meta_base, "row": n, "id": id_fila, "filtro": filtro}
+                        )
+                        for contenido, n, id_fila in zip(contenidos, filas, ids)
+                    )
+                return
+            except pa.ArrowException:
+                # Fila irregular más adelante: seguir con el módulo csv
+                pass
 
     with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        lector = csv.DictReader(f)
+        lector = csv.reader(f)
+        cabecera = next(lector, [])
+        posiciones = _posiciones_csv(cabecera)
+        if columna_filtro not in posiciones:
+            return
+        campos = list(posiciones.items())
+        i_filtro = posiciones[columna_filtro]
+        i_contenido = posiciones.get(columna_contenido) if columna_contenido else None
+        i_id = posiciones.get("id")
+
+        for num_fila, fila in _filas_csv(lector, num_fila):
+            # Filtrar
+            if _valor_csv(fila, i_filtro) != valor_filtro:
+                continue
 
-        for num_fila, fila in enumerate(lector, 1):
-            # Combinar columnas especificadas
-            contenido = separador.join(
-                f"{col}: {fila.get(col, 'N/A')}" for col in columnas_contenido
-                if col in fila
-            )
+            if i_contenido is not None:
+                contenido = _valor_csv(fila, i_contenido)
+            else:
+                contenido = _unir_fila_csv(campos, len(cabecera), fila)
 
-            documents.append(Document(
+            yield Document(
                 page_content=contenido,
                 metadata={
-                    "source": "csv",
+                    **meta_base,
                     "row": num_fila,
-                    "id": fila.get("id", f"row_{num_fila}")
+                    "id": _valor_csv(fila, i_id) if i_id is not None else None,
+                    "filtro": filtro
                 }
-            ))
-
-    return documents
+            )
 
 
 def cargar_csv_filtrado(
@@ -154,33 +529,7 @@ def cargar_csv_filtrado(
     Returns:
         Lista de documentos
     """
-    documents = []
-
-    with open(ruta_archivo, 'r', encoding='utf-8') as f:
-        lector = csv.DictReader(f)
-
-        for num_fila, fila in enumerate(lector, 1):
-            # Filtrar
-            if columna_filtro not in fila or fila[columna_filtro] != valor_filtro:
-                continue
-
-            # Contenido
-            if columna_contenido and columna_contenido in fila:
-                contenido = fila[columna_contenido]
-            else:
-                contenido = " | ".join(f"{k}: {v}" for k, v in fila.items())
-
-            documents.append(Document(
-                page_content=contenido,
-                metadata={
-                    "source": "csv",
-                    "row": num_fila,
-                    "id": fila.get("id"),
-                    "filtro": f"{columna_filtro}={valor_filtro}"
-                }
-            ))
-
-    return documents
+    return list(iter_csv_filtrado(ruta_archivo, columna_filtro, valor_filtro, columna_contenido))
 
 
 if __name__ == "__main__":
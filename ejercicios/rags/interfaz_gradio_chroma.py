@@ -4,68 +4,128 @@ import os
 import json
 import numpy as np
 import re
-from sklearn.metrics.pairwise import cosine_similarity
+from functools import lru_cache
 from typing import Optional
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "chroma_db_constitucion")
 
+# Article references in the query ("artículo 14"), compiled once
+ARTICLE_RE = re.compile(r'\bart[íi]culo\s+(\d+)\b', re.IGNORECASE)
+
 # Initialize ChromaDB
 client = chromadb.PersistentClient(path=DB_PATH)
 collection = client.get_collection("constitucion_espanola")
 
-def calculate_mmr(query_embedding, doc_embeddings, doc_ids, k, lambda_mult):
+# Keep every document embedding in memory so MMR doesn't have to pull them
+# from Chroma on each query
+_all_embeddings = collection.get(include=['embeddings'])
+DOC_EMBEDDINGS = np.asarray(_all_embeddings['embeddings'], dtype=np.float32)
+DOC_INDEX = {doc_id: i for i, doc_id in enumerate(_all_embeddings['ids'])}
+del _all_embeddings
+
+def _mmr_select(sims_to_query, sim_matrix, k, lambda_mult):
     """
-    Maximal Marginal Relevance (MMR) implementation.
+    Greedy MMR selection over precomputed similarities.
+    Compiled with numba when available; returns the selected indices.
     """
-    if isinstance(query_embedding, list):
-        query_embedding = np.array(query_embedding)
-    if isinstance(doc_embeddings, list):
-        doc_embeddings = np.array(doc_embeddings)
-        
-    # Ensure 2D arrays
-    if query_embedding.ndim == 1:
-        query_embedding = query_embedding.reshape(1, -1)
-        
-    # Calculate similarities between query and all docs
-    # Assuming embeddings are normalized, cosine similarity is dot product
-    # But let's use sklearn to be safe
-    sims_to_query = cosine_similarity(query_embedding, doc_embeddings)[0]
-    
-    selected_indices = []
-    candidate_indices = list(range(len(doc_ids)))
-    
-    for _ in range(min(k, len(doc_ids))):
-        best_mmr = -float('inf')
+    n_docs = sims_to_query.shape[0]
+    selected = np.empty(k, dtype=np.int64)
+    # Max similarity of each doc to the already selected ones (0 while empty)
+    max_sim_selected = np.zeros(n_docs)
+    taken = np.zeros(n_docs, dtype=np.bool_)
+
+    for i in range(k):
+        best_mmr = -np.inf
         best_idx = -1
-        
-        for idx in candidate_indices:
-            # Similarity to query
-            sim_query = sims_to_query[idx]
-            
-            # Max similarity to already selected docs
-            if not selected_indices:
-                max_sim_selected = 0
-            else:
-                selected_embeddings = doc_embeddings[selected_indices]
-                current_embedding = doc_embeddings[idx].reshape(1, -1)
-                sims_selected = cosine_similarity(current_embedding, selected_embeddings)[0]
-                max_sim_selected = np.max(sims_selected)
-                
-            # MMR score
-            mmr_score = (lambda_mult * sim_query) - ((1 - lambda_mult) * max_sim_selected)
-            
+        for j in range(n_docs):
+            if taken[j]:
+                continue
+            mmr_score = (lambda_mult * sims_to_query[j]) - ((1 - lambda_mult) * max_sim_selected[j])
             if mmr_score > best_mmr:
                 best_mmr = mmr_score
-                best_idx = idx
-        
-        if best_idx != -1:
-            selected_indices.append(best_idx)
-            candidate_indices.remove(best_idx)
-            
+                best_idx = j
+
+        if best_idx == -1:
+            return selected[:i]
+        selected[i] = best_idx
+        taken[best_idx] = True
+        for j in range(n_docs):
+            sim = sim_matrix[best_idx, j]
+            if i == 0 or sim > max_sim_selected[j]:
+                max_sim_selected[j] = sim
+
+    return selected
+
+if HAS_NUMBA:
+    _mmr_select = njit(cache=True)(_mmr_select)
+
+def calculate_mmr(query_embedding, doc_embeddings, doc_ids, k, lambda_mult):
+    """
+    Maximal Marginal Relevance (MMR) implementation.
+    """
+    # Contiguous float32 copies, L2-normalized so cosine is a plain dot product
+    query_embedding = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+    doc_embeddings = np.asarray(doc_embeddings, dtype=np.float32)
+    query_embedding = query_embedding / (np.linalg.norm(query_embedding) + 1e-12)
+    doc_embeddings = doc_embeddings / (np.linalg.norm(doc_embeddings, axis=1, keepdims=True) + 1e-12)
+
+    # Calculate similarities between query and all docs, and between all
+    # pairs of docs, once. The greedy loop below only indexes into them.
+    sims_to_query = doc_embeddings @ query_embedding
+    sim_matrix = doc_embeddings @ doc_embeddings.T
+
+    n_docs = len(doc_ids)
+    if HAS_NUMBA:
+        return _mmr_select(sims_to_query, sim_matrix, min(k, n_docs), float(lambda_mult)).tolist()
+
+    selected_indices = []
+    # Max similarity of each doc to the already selected ones (0 while empty)
+    max_sim_selected = np.zeros(n_docs)
+    selected_mask = np.zeros(n_docs, dtype=bool)
+
+    for _ in range(min(k, n_docs)):
+        # MMR score for every candidate at once
+        mmr_scores = (lambda_mult * sims_to_query) - ((1 - lambda_mult) * max_sim_selected)
+        mmr_scores[selected_mask] = -np.inf
+        best_idx = int(np.argmax(mmr_scores))
+
+        if not selected_indices:
+            max_sim_selected = sim_matrix[best_idx].copy()
+        else:
+            np.maximum(max_sim_selected, sim_matrix[best_idx], out=max_sim_selected)
+        selected_indices.append(best_idx)
+        selected_mask[best_idx] = True
+
     return selected_indices
 
+def get_doc_embeddings(ids):
+    """
+    Embeddings for the given document ids, in the same order.
+    Served from memory; falls back to Chroma for docs added after startup.
+    """
+    try:
+        return DOC_EMBEDDINGS[[DOC_INDEX[doc_id] for doc_id in ids]]
+    except KeyError:
+        fetched = collection.get(ids=list(ids), include=['embeddings'])
+        by_id = dict(zip(fetched['ids'], fetched['embeddings']))
+        return np.asarray([by_id[doc_id] for doc_id in ids], dtype=np.float32)
+
+@lru_cache(maxsize=256)
+def _parse_where(where_str):
+    """
+    Parse the JSON 'where' filter, memoized for repeated filters.
+    The returned dict is shared between calls and must not be mutated.
+    """
+    return json.loads(where_str)
+
 def search_function(query, k, fetch_k, lambda_mult, where_str, score_threshold, agent_type, agent_role, agent_task):
     try:
         # Initialize agent info
@@ -78,9 +138,9 @@ def search_function(query, k, fetch_k, lambda_mult, where_str, score_threshold,
 
         # Parse 'where' filter
         where_filter = None
-        if where_str and where_str.strip():
+        if where_str and not where_str.isspace():
             try:
-                where_filter = json.loads(where_str)
+                where_filter = _parse_where(where_str.strip())
             except json.JSONDecodeError:
                 return f"Error: Invalid JSON in 'where' filter. Example: {{\"tipo\": \"TÍTULO\"}}"
 
@@ -88,7 +148,7 @@ def search_function(query, k, fetch_k, lambda_mult, where_str, score_threshold,
         detected_filter_msg = ""
         if not where_filter:
             # Regex to find "articulo X" or "artículo X"
-            match = re.search(r'\bart[íi]culo\s+(\d+)\b', query, re.IGNORECASE)
+            match = ARTICLE_RE.search(query)
             if match:
                 art_num = match.group(1)
                 # Construct the expected metadata value, e.g., "Artículo 14"
@@ -105,20 +165,23 @@ def search_function(query, k, fetch_k, lambda_mult, where_str, score_threshold,
         # But we need the query embedding.
         # Let's use the internal embedding function of the collection if possible.
         
+        # Embed the query once and hand the vector to Chroma; passing
+        # query_texts would make it run the embedding model a second time.
         embedding_function = collection._embedding_function
         if embedding_function:
-            query_embeddings = embedding_function([query])
+            query_embedding = embedding_function([query])[0]
         else:
             # Fallback if no embedding function is set (shouldn't happen with default)
             return "Error: No embedding function found in collection."
 
         # 2. Initial Fetch (fetch_k)
-        # We need embeddings to calculate MMR
+        # Document embeddings for MMR come from memory (DOC_EMBEDDINGS), so
+        # they are not transferred with the results.
         results = collection.query(
-            query_texts=[query],
+            query_embeddings=[query_embedding],
             n_results=int(fetch_k),
             where=where_filter,
-            include=['documents', 'metadatas', 'distances', 'embeddings']
+            include=['documents', 'metadatas', 'distances']
         )
         
         if not results['ids'] or not results['ids'][0]:
@@ -129,7 +192,6 @@ def search_function(query, k, fetch_k, lambda_mult, where_str, score_threshold,
         documents = results['documents'][0]
         metadatas = results['metadatas'][0]
         distances = results['distances'][0]
-        embeddings = results['embeddings'][0]
         
         # 3. Filter by Score Threshold (Distance)
         # Chroma returns L2 distance by default. Lower is better.
@@ -154,8 +216,8 @@ def search_function(query, k, fetch_k, lambda_mult, where_str, score_threshold,
         else:
             # Apply MMR
             selected_indices = calculate_mmr(
-                query_embeddings[0], 
-                embeddings, 
+                query_embedding,
+                get_doc_embeddings(ids),
                 ids, 
                 k=int(k), 
                 lambda_mult=lambda_mult
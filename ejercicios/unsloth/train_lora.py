@@ -7,19 +7,35 @@ Trains a LoRA adapter on constitution data with sentence-based chunking
 import os
 import re
 import torch
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import List
-from transformers import AutoTokenizer, AutoModelForCausalLM, TrainingArguments, Trainer
+from transformers import (
+    AutoTokenizer,
+    AutoModelForCausalLM,
+    BitsAndBytesConfig,
+    TrainingArguments,
+    Trainer,
+    default_data_collator,
+)
 from datasets import Dataset
-from peft import get_peft_model, LoraConfig, TaskType
+from peft import get_peft_model, prepare_model_for_kbit_training, LoraConfig, TaskType
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import flash_attn  # noqa: F401
+    HAS_FLASH_ATTN = True
+except ImportError:
+    HAS_FLASH_ATTN = False
+
 # Configuration
 CONFIG = {
     "model_name": "mistralai/Mistral-7B-v0.1",
     "max_seq_length": 2048,
-    "dtype": torch.float16,
+    # bf16 where the GPU supports it (Ampere+), fp16 otherwise
+    "dtype": torch.bfloat16 if torch.cuda.is_available() and torch.cuda.is_bf16_supported() else torch.float16,
     "lora_rank": 16,
     "lora_alpha": 32,
     "lora_dropout": 0.05,
@@ -27,8 +43,14 @@ CONFIG = {
     "batch_size": 4,
     "epochs": 1,
     "output_dir": "unsloth_model",
+    "num_proc": max(1, (os.cpu_count() or 1) // 2),
+    # FlashAttention-2 if installed (pip install flash-attn --no-build-isolation)
+    "attn_implementation": "flash_attention_2" if HAS_FLASH_ATTN else "sdpa",
 }
 
+# Sentence boundary: whitespace after ., ! or ?
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
 
 def load_data_files(data_dir: str) -> str:
     """Load all text files from data directory."""
@@ -36,21 +58,24 @@ def load_data_files(data_dir: str) -> str:
     if not data_path.exists():
         raise ValueError(f"Data directory not found: {data_dir}")
 
-    text_content = ""
-    for pattern in ["*.md", "*.txt", "*.json"]:
-        for file_path in data_path.glob(pattern):
-            print(f"Loading {file_path.name}...")
-            with open(file_path, "r", encoding="utf-8") as f:
-                text_content += f.read() + "\n\n"
+    file_paths = [
+        file_path
+        for pattern in ["*.md", "*.txt", "*.json"]
+        for file_path in data_path.glob(pattern)
+    ]
+    for file_path in file_paths:
+        print(f"Loading {file_path.name}...")
 
-    return text_content
+    # Overlap the disk reads; map keeps the original file order
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        texts = list(executor.map(partial(Path.read_text, encoding="utf-8"), file_paths))
+
+    return "".join(text + "\n\n" for text in texts)
 
 
 def split_into_sentences(text: str) -> List[str]:
     """Split text into sentences using regex."""
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    return sentences
+    return [s for s in (part.strip() for part in SENTENCE_SPLIT_RE.split(text)) if s]
 
 
 def chunk_text_by_tokens(
@@ -60,23 +85,28 @@ def chunk_text_by_tokens(
 ) -> List[str]:
     """Chunk text into maximum token size, splitting by sentences."""
     sentences = split_into_sentences(text)
+    if not sentences:
+        return []
+
+    # Tokenize all sentences in one batched call instead of one per sentence
+    encoded = tokenizer(sentences, add_special_tokens=False)
+    sentence_lengths = [len(ids) for ids in encoded["input_ids"]]
+
     chunks = []
-    current_chunk = ""
+    current_parts: List[str] = []
     current_tokens = 0
 
-    for sentence in sentences:
-        sentence_tokens = len(tokenizer.encode(sentence, add_special_tokens=False))
-
-        if current_tokens + sentence_tokens > max_tokens and current_chunk:
-            chunks.append(current_chunk.strip())
-            current_chunk = ""
+    for sentence, sentence_tokens in zip(sentences, sentence_lengths):
+        if current_tokens + sentence_tokens > max_tokens and current_parts:
+            chunks.append(" ".join(current_parts))
+            current_parts = []
             current_tokens = 0
 
-        current_chunk += " " + sentence
+        current_parts.append(sentence)
         current_tokens += sentence_tokens
 
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
+    if current_parts:
+        chunks.append(" ".join(current_parts))
 
     return chunks
 
@@ -90,15 +120,37 @@ def prepare_training_data(chunks: List[str]) -> Dataset:
 
 
 def tokenize_function(examples, tokenizer, max_length=2048):
-    """Tokenize function for dataset."""
+    """Tokenize function for dataset (padding is done per batch by the collator)."""
     return tokenizer(
         examples["text"],
         truncation=True,
         max_length=max_length,
-        padding="max_length",
     )
 
 
+def pack_sequences(examples, block_size: int, eos_token_id: int):
+    """
+    Concatenate tokenized samples (EOS-separated) into blocks of exactly block_size tokens.
+
+    Labels are built here so the EOS separators are trained on: a collator that
+    derives labels from the pad token would mask them, since pad == eos. The last
+    block is padded with attention_mask 0 and label -100.
+    """
+    input_ids: List[int] = []
+    for ids in examples["input_ids"]:
+        input_ids.extend(ids)
+        input_ids.append(eos_token_id)
+
+    blocks, attention_mask, labels = [], [], []
+    for i in range(0, len(input_ids), block_size):
+        block = input_ids[i:i + block_size]
+        padding = block_size - len(block)
+        blocks.append(block + [eos_token_id] * padding)
+        attention_mask.append([1] * len(block) + [0] * padding)
+        labels.append(block + [-100] * padding)
+    return {"input_ids": blocks, "attention_mask": attention_mask, "labels": labels}
+
+
 def main():
     print("=" * 60)
     print("LoRA Training for Mistral 7B")
@@ -132,12 +184,23 @@ def main():
     # Step 4: Load model
     print("\n[4/5] Loading Mistral 7B model...")
     print("Note: First download may take several minutes (~15GB)")
+    print(f"Attention implementation: {CONFIG['attn_implementation']}")
+
+    # QLoRA: frozen base weights in 4-bit NF4, LoRA adapters trained on top
+    bnb_config = BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_quant_type="nf4",
+        bnb_4bit_compute_dtype=CONFIG["dtype"],
+        bnb_4bit_use_double_quant=True,
+    )
 
     try:
         model = AutoModelForCausalLM.from_pretrained(
             CONFIG["model_name"],
             device_map="auto",
             torch_dtype=CONFIG["dtype"],
+            quantization_config=bnb_config,
+            attn_implementation=CONFIG["attn_implementation"],
             trust_remote_code=True,
         )
     except Exception as e:
@@ -145,6 +208,8 @@ def main():
         print("Make sure you have sufficient disk space and GPU memory")
         return
 
+    model = prepare_model_for_kbit_training(model, use_gradient_checkpointing=True)
+
     # Add LoRA adapters
     peft_config = LoraConfig(
         task_type=TaskType.CAUSAL_LM,
@@ -152,7 +217,7 @@ def main():
         lora_alpha=CONFIG["lora_alpha"],
         lora_dropout=CONFIG["lora_dropout"],
         bias="none",
-        target_modules=["q_proj", "v_proj"],
+        target_modules=["q_proj", "k_proj", "v_proj", "o_proj", "gate_proj", "up_proj", "down_proj"],
     )
 
     model = get_peft_model(model, peft_config)
@@ -164,10 +229,24 @@ def main():
     dataset = prepare_training_data(chunks)
     print(f"Dataset size: {len(dataset)} samples")
 
+    # partial instead of a lambda so the function can be sent to worker processes
     tokenized_dataset = dataset.map(
-        lambda x: tokenize_function(x, tokenizer, CONFIG["max_seq_length"]),
+        partial(tokenize_function, tokenizer=tokenizer, max_length=CONFIG["max_seq_length"]),
+        batched=True,
+        batch_size=1000,
+        num_proc=CONFIG["num_proc"],
+        remove_columns=["text"],
+    )
+
+    # Pack chunks into full-length samples so no step is spent on short sequences
+    tokenized_dataset = tokenized_dataset.map(
+        partial(pack_sequences, block_size=CONFIG["max_seq_length"], eos_token_id=tokenizer.eos_token_id),
         batched=True,
+        batch_size=1000,
+        num_proc=CONFIG["num_proc"],
+        remove_columns=tokenized_dataset.column_names,
     )
+    print(f"Packed into {len(tokenized_dataset)} samples of up to {CONFIG['max_seq_length']} tokens")
 
     training_args = TrainingArguments(
         output_dir=CONFIG["output_dir"],
@@ -177,13 +256,18 @@ def main():
         save_strategy="epoch",
         logging_steps=5,
         gradient_accumulation_steps=4,
-        fp16=True,
+        bf16=CONFIG["dtype"] == torch.bfloat16,
+        fp16=CONFIG["dtype"] == torch.float16,
+        gradient_checkpointing=True,
+        gradient_checkpointing_kwargs={"use_reentrant": False},
     )
 
+    # Packed blocks are fixed-length and already carry labels: just stack them
     trainer = Trainer(
         model=model,
         args=training_args,
         train_dataset=tokenized_dataset,
+        data_collator=default_data_collator,
     )
 
     print("Starting training...")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Pruebas de utilidades_conversiones: conversión de archivos por lotes.
+
+Uso:
+    python -m pytest test_utilidades_conversiones.py
+    python test_utilidades_conversiones.py
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+from utilidades_conversiones import ConvertidorFormatos, _convertir_uno
+
+
+def test_convertir_uno_escribe_junto_al_original():
+    """a.json -> a.yaml en el mismo directorio"""
+    with tempfile.TemporaryDirectory() as tmp:
+        origen = Path(tmp) / "a.json"
+        origen.write_text(json.dumps({"nombre": "Juan", "edad": 30}), encoding="utf-8")
+
+        destino = _convertir_uno(str(origen), "yaml")
+
+        assert destino == str(Path(tmp) / "a.yaml")
+        assert Path(destino).read_text(encoding="utf-8") == "edad: 30\nnombre: Juan\n"
+
+
+def test_convertir_uno_no_sobrescribe_el_original():
+    """a.json -> 'json' sin directorio de salida debe fallar sin tocar el archivo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        origen = Path(tmp) / "a.json"
+        contenido = '{"nombre":"Juan"}'
+        origen.write_text(contenido, encoding="utf-8")
+
+        for directorio_salida in (None, tmp):
+            try:
+                _convertir_uno(str(origen), "json", directorio_salida)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("Se esperaba ValueError al sobrescribir la entrada")
+            assert origen.read_text(encoding="utf-8") == contenido
+
+
+def test_convertir_archivos_mismo_formato_en_otro_directorio():
+    """Con directorio_salida distinto, el mismo formato sí se convierte"""
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as salida:
+        origen = Path(tmp) / "a.json"
+        origen.write_text('{"a":1}', encoding="utf-8")
+
+        rutas = ConvertidorFormatos.convertir_archivos([str(origen)], "json", salida, max_workers=1)
+
+        assert rutas == [str(Path(salida) / "a.json")]
+        assert Path(rutas[0]).read_text(encoding="utf-8") == '{\n  "a": 1\n}'
+        assert origen.read_text(encoding="utf-8") == '{"a":1}'
+
+
+def test_convertir_archivos_async_no_sobrescribe_el_original():
+    """La variante asíncrona también rechaza escribir sobre la entrada"""
+    with tempfile.TemporaryDirectory() as tmp:
+        origen = Path(tmp) / "a.yaml"
+        origen.write_text("a: 1\n", encoding="utf-8")
+
+        try:
+            asyncio.run(ConvertidorFormatos.convertir_archivos_async([str(origen)], "yaml"))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Se esperaba ValueError al sobrescribir la entrada")
+        assert origen.read_text(encoding="utf-8") == "a: 1\n"
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
@@ -2,201 +2,673 @@
 Utilidades para convertir entre formatos JSON, YAML y TOML
 """
 
+import asyncio
 import json
+import mmap
+import os
 import yaml
-import toml
+import tomli_w
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+try:
+    # Implementaciones en C de libyaml; mismo resultado que las de Python
+    from yaml import CSafeLoader as _YamlLoader, CDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, Dumper as _YamlDumper
+
+try:
+    import orjson
+    HAS_ORJSON = True
+    _OPCIONES_ORJSON = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    HAS_ORJSON = False
+
+# Serializadores/parsers con sus opciones fijadas una sola vez al importar
+_yaml_load = partial(yaml.load, Loader=_YamlLoader)
+_yaml_dump = partial(yaml.dump, Dumper=_YamlDumper, default_flow_style=False, allow_unicode=True)
+# Codificadores json reutilizables: json.dumps crea un JSONEncoder en cada llamada
+_json_dumps_std = json.JSONEncoder(indent=2, ensure_ascii=False).encode
+_json_escalar_std = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _json_loads(contenido: Union[str, bytes]) -> Any:
+    """
+    Parsea JSON con orjson si está disponible
+
+    Args:
+        contenido: Texto, bytes o memoryview JSON
+
+    Returns:
+        Objeto Python
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(contenido)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity o enteros de más de 64 bits: json sí los acepta
+            pass
+    if isinstance(contenido, memoryview):
+        contenido = contenido.tobytes()
+    return json.loads(contenido)
+
+
+def _json_dumps_pretty(datos: Any) -> str:
+    """
+    Serializa a JSON indentado (2 espacios) sin escapar caracteres no ASCII
+
+    Args:
+        datos: Objeto Python
+
+    Returns:
+        String en formato JSON formateado
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(datos, option=_OPCIONES_ORJSON).decode('utf-8')
+        except TypeError:
+            # Tipos que orjson no serializa (p. ej. enteros de más de 64 bits)
+            pass
+    return _json_dumps_std(datos)
+
+
+def _toml_loads(contenido: Union[str, bytes]) -> dict:
+    """
+    Parsea TOML con tomllib (parser de la biblioteca estándar)
+
+    Args:
+        contenido: Texto TOML o bytes UTF-8
+
+    Returns:
+        Diccionario Python
+    """
+    if isinstance(contenido, bytes):
+        # tomllib solo acepta str
+        contenido = contenido.decode('utf-8')
+    return tomllib.loads(contenido)
+
+
+def _sin_nulos(valor: Any) -> Any:
+    """
+    Copia de los datos sin las claves cuyo valor es None (en cualquier nivel)
+
+    Args:
+        valor: Objeto Python
+
+    Returns:
+        Objeto equivalente sin entradas None en los diccionarios
+    """
+    if isinstance(valor, dict):
+        return {clave: _sin_nulos(v) for clave, v in valor.items() if v is not None}
+    if isinstance(valor, list):
+        return [_sin_nulos(v) for v in valor]
+    return valor
+
+
+def _toml_dumps(datos: Any) -> str:
+    """
+    Serializa a TOML con tomli_w
+
+    TOML no tiene null: las claves con valor None se omiten (como hacía el
+    paquete toml). Un None dentro de una lista sí lanza TypeError.
+
+    Args:
+        datos: Diccionario Python
+
+    Returns:
+        String en formato TOML
+    """
+    if not isinstance(datos, dict):
+        raise TypeError("TOML solo admite un diccionario en el nivel superior")
+    return tomli_w.dumps(_sin_nulos(datos))
+
+
+# Por debajo de este tamaño leer el archivo entero es más barato que mapearlo
+_TAM_MIN_MMAP = 64 * 1024
+
+
+@contextmanager
+def _contenido_mapeado(ruta_path: Path) -> Iterator[Union[bytes, mmap.mmap]]:
+    """
+    Contenido binario de un archivo; los grandes se mapean en memoria
+
+    Args:
+        ruta_path: Ruta del archivo
+
+    Yields:
+        bytes (archivos pequeños) o mmap de solo lectura (grandes)
+    """
+    if ruta_path.stat().st_size < _TAM_MIN_MMAP:
+        yield ruta_path.read_bytes()
+        return
+
+    with open(ruta_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
+
+
+def _cargar_json(ruta_path: Path) -> Any:
+    """Lee y parsea un archivo JSON"""
+    with _contenido_mapeado(ruta_path) as contenido:
+        # orjson lee directamente del mapa, sin copiarlo
+        with memoryview(contenido) as vista:
+            return _json_loads(vista)
+
+
+def _cargar_yaml(ruta_path: Path) -> Any:
+    """Lee y parsea un archivo YAML"""
+    with _contenido_mapeado(ruta_path) as contenido:
+        # libyaml lee el mmap por bloques, como un archivo
+        return _yaml_load(contenido)
+
+
+def _cargar_toml(ruta_path: Path) -> Any:
+    """Lee y parsea un archivo TOML"""
+    # tomllib solo acepta str
+    return _toml_loads(ruta_path.read_text(encoding='utf-8'))
+
+
+# Tablas de despacho: extensión de entrada -> lector, formato de salida -> serializador
+_CARGADORES = {
+    '.json': _cargar_json,
+    '.yaml': _cargar_yaml,
+    '.yml': _cargar_yaml,
+    '.toml': _cargar_toml,
+}
+
+_FORMATO_POR_EXTENSION = {
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.toml': 'toml',
+}
+
+_PARSEADORES = {
+    'json': _json_loads,
+    'yaml': _yaml_load,
+    'toml': _toml_loads,
+}
+
+_SERIALIZADORES = {
+    'json': _json_dumps_pretty,
+    'yaml': _yaml_dump,
+    'toml': _toml_dumps,
+}
+
+
+def _asegurar_datos(datos: Union[str, bytes, dict], formato: str) -> Any:
+    """
+    Devuelve los datos como objeto Python, parseando solo si llegan como texto
+
+    Args:
+        datos: String o bytes en el formato indicado u objeto Python ya parseado
+        formato: Formato del string ('json', 'yaml' o 'toml')
+
+    Returns:
+        Objeto Python
+    """
+    if not isinstance(datos, (str, bytes)):
+        return datos
+    parser = _PARSEADORES.get(formato)
+    if parser is None:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return parser(datos)
+
+
+@lru_cache(maxsize=1024)
+def _convertir_texto(texto: Union[str, bytes], origen: str, destino: str) -> str:
+    """
+    Convierte texto entre formatos, memorizando los últimos 1024 resultados
+
+    Las conversiones de str/bytes no tienen efectos secundarios y el
+    resultado es inmutable, así que repetir la misma entrada no vuelve a
+    parsear ni serializar. Los diccionarios no pasan por aquí (no son hashables).
+
+    Args:
+        texto: String o bytes en el formato de origen
+        origen: Formato de entrada
+        destino: Formato de salida
+
+    Returns:
+        String en el formato de destino
+    """
+    return _SERIALIZADORES[destino](_asegurar_datos(texto, origen))
+
+
+def _convertir(datos: Union[str, bytes, dict], origen: str, destino: str) -> str:
+    """Convierte usando la caché si los datos llegan como texto"""
+    if isinstance(datos, (str, bytes)):
+        return _convertir_texto(datos, origen, destino)
+    return _SERIALIZADORES[destino](datos)
+
+
+# A partir de este tamaño YAML -> JSON se hace por eventos, sin construir el árbol
+_TAM_MIN_STREAMING = 1024 * 1024
+
+_TAG_YAML = 'tag:yaml.org,2002:'
+_TAGS_ESCALARES = {_TAG_YAML + t for t in ('str', 'int', 'float', 'bool', 'null')}
+_TAGS_CONTENEDORES = {None, '!', _TAG_YAML + 'map', _TAG_YAML + 'seq'}
+
+
+class _SinStreaming(Exception):
+    """El documento usa algo que solo la ruta con árbol completo reproduce igual"""
+
+
+def _escalar_yaml(evento: yaml.ScalarEvent, resolver: yaml.resolver.Resolver,
+                  constructor: yaml.constructor.SafeConstructor) -> Any:
+    """
+    Resuelve y construye el valor de un escalar como lo haría SafeLoader
+
+    Args:
+        evento: Evento de escalar del parser
+        resolver: Resolver de tags implícitos
+        constructor: Constructor seguro de PyYAML
+
+    Returns:
+        Valor Python (str, int, float, bool o None)
+    """
+    tag = evento.tag
+    if tag is None or tag == '!':
+        tag = resolver.resolve(yaml.ScalarNode, evento.value, evento.implicit)
+    if tag not in _TAGS_ESCALARES:
+        # Fechas, binarios, claves de fusión (<<) o tags propios
+        raise _SinStreaming(tag)
+    # Constructor del tag llamado directamente: construct_object guardaría
+    # cada nodo en constructed_objects hasta el final del documento
+    return constructor.yaml_constructors[tag](constructor, yaml.ScalarNode(tag, evento.value))
+
+
+def _json_escalar(valor: Any) -> str:
+    """Serializa un escalar igual que _json_dumps_pretty"""
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(valor).decode('utf-8')
+        except TypeError:
+            # _json_dumps_pretty pasaría todo el documento a json
+            raise _SinStreaming('entero de más de 64 bits')
+    # Los str van directos al escapado en C (encode_basestring)
+    return _json_escalar_std(valor)
+
+
+def _yaml_a_json_streaming(ruta_path: Path) -> str:
+    """
+    Convierte un archivo YAML a JSON indentado recorriendo los eventos del parser
+
+    Genera el mismo texto que _json_dumps_pretty(_cargar_yaml(ruta_path)) sin
+    construir el árbol de objetos intermedio. Si el documento usa anclas,
+    claves no string, claves repetidas o tags no básicos, lanza _SinStreaming.
+
+    Args:
+        ruta_path: Ruta del archivo YAML
+
+    Returns:
+        String en formato JSON formateado
+    """
+    resolver = yaml.resolver.Resolver()
+    constructor = yaml.constructor.SafeConstructor()
+    partes: List[str] = []
+    # Cada nivel: [es_mapa, elementos_escritos, espera_clave, claves_vistas]
+    pila: List[list] = []
+    # Prefijos de cada profundidad, creados una vez y reutilizados en cada
+    # elemento: sangrias[n] = salto + n niveles, comas[n] = ',' + sangrias[n]
+    sangrias = ['\n']
+    comas = [',\n']
+    documentos = 0
+
+    with _contenido_mapeado(ruta_path) as contenido:
+        for evento in yaml.parse(contenido, Loader=_YamlLoader):
+            if isinstance(evento, yaml.DocumentStartEvent):
+                documentos += 1
+                if documentos > 1:
+                    raise _SinStreaming('varios documentos')
+                continue
+            if isinstance(evento, (yaml.StreamStartEvent, yaml.StreamEndEvent,
+                                   yaml.DocumentEndEvent)):
+                continue
+            if isinstance(evento, yaml.AliasEvent):
+                raise _SinStreaming('alias')
+
+            if isinstance(evento, yaml.CollectionEndEvent):
+                _, escritos, _, _ = pila.pop()
+                if escritos:
+                    partes.append(sangrias[len(pila)])
+                partes.append('}' if isinstance(evento, yaml.MappingEndEvent) else ']')
+            else:
+                nivel = pila[-1] if pila else None
+                if nivel is not None and nivel[0] and nivel[2]:
+                    # Clave de un mapa: solo strings, sin repetir
+                    if not isinstance(evento, yaml.ScalarEvent):
+                        raise _SinStreaming('clave compuesta')
+                    clave = _escalar_yaml(evento, resolver, constructor)
+                    if not isinstance(clave, str) or clave in nivel[3]:
+                        raise _SinStreaming('clave no string o repetida')
+                    nivel[3].add(clave)
+                    partes.append((comas if nivel[1] else sangrias)[len(pila)])
+                    partes.append(_json_escalar(clave))
+                    partes.append(': ')
+                    nivel[2] = False
+                    continue
+                if nivel is not None and not nivel[0]:
+                    partes.append((comas if nivel[1] else sangrias)[len(pila)])
+
+                if isinstance(evento, yaml.ScalarEvent):
+                    partes.append(_json_escalar(_escalar_yaml(evento, resolver, constructor)))
+                else:
+                    if evento.tag not in _TAGS_CONTENEDORES:
+                        raise _SinStreaming(evento.tag)
+                    es_mapa = isinstance(evento, yaml.MappingStartEvent)
+                    partes.append('{' if es_mapa else '[')
+                    pila.append([es_mapa, 0, True, set()])
+                    if len(sangrias) <= len(pila):
+                        sangrias.append(sangrias[-1] + '  ')
+                        comas.append(comas[-1] + '  ')
+                    continue
+
+            # Se ha completado un valor: avanzar el contenedor padre
+            if pila:
+                pila[-1][1] += 1
+                pila[-1][2] = True
+
+    if documentos == 0:
+        raise _SinStreaming('documento vacío')
+    return ''.join(partes)
+
+
+def _archivo_a(ruta: str, formato: str, preservar: bool = False) -> str:
+    """
+    Lee un archivo (JSON, YAML o TOML) y lo convierte al formato indicado
+
+    Args:
+        ruta: Ruta del archivo
+        formato: Formato de salida ('json', 'yaml' o 'toml')
+        preservar: Si el archivo ya está en el formato de salida, devolver
+            su texto tal cual (solo se valida) en lugar de reformatearlo
+
+    Returns:
+        String en el formato de salida
+    """
+    ruta_path = Path(ruta)
+    extension = ruta_path.suffix.lower()
+    cargador = _CARGADORES.get(extension)
+    if cargador is None:
+        raise ValueError(f"Formato no soportado: {extension}")
+
+    if preservar and _FORMATO_POR_EXTENSION[extension] == formato:
+        texto = ruta_path.read_text(encoding='utf-8')
+        _PARSEADORES[formato](texto)
+        return texto
+
+    if (formato == 'json' and extension in ('.yaml', '.yml')
+            and ruta_path.stat().st_size >= _TAM_MIN_STREAMING):
+        try:
+            return _yaml_a_json_streaming(ruta_path)
+        except _SinStreaming:
+            pass
+
+    return _SERIALIZADORES[formato](cargador(ruta_path))
+
+
+def _escribir_bytes(ruta_salida: str, contenido: bytes) -> None:
+    """
+    Escribe bytes con llamadas directas a os.write, sin la capa de io
+
+    Args:
+        ruta_salida: Ruta del archivo (se crea o se trunca, permisos 0o644)
+        contenido: Bytes a escribir
+    """
+    fd = os.open(ruta_salida, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        vista = memoryview(contenido)
+        # os.write puede escribir menos de lo pedido
+        while vista:
+            vista = vista[os.write(fd, vista):]
+    finally:
+        os.close(fd)
+
+
+def _convertir_uno(ruta: str, formato: str, directorio_salida: Optional[str] = None) -> str:
+    """
+    Convierte un archivo y guarda el resultado junto a él (o en directorio_salida)
+
+    Función de módulo para que ProcessPoolExecutor pueda serializarla.
+
+    Args:
+        ruta: Ruta del archivo de entrada
+        formato: Formato de salida ('json', 'yaml' o 'toml')
+        directorio_salida: Directorio donde escribir; por defecto el del archivo
+
+    Returns:
+        Ruta del archivo generado
+
+    Raises:
+        ValueError: Si la salida sería el propio archivo de entrada
+            (p. ej. a.json a 'json' sin directorio_salida)
+    """
+    ruta_path = Path(ruta)
+    destino = ruta_path.with_suffix(f'.{formato}')
+    if directorio_salida is not None:
+        destino = Path(directorio_salida) / destino.name
+    if destino.resolve() == ruta_path.resolve():
+        raise ValueError(f"La conversión sobrescribiría el archivo de entrada: {ruta}")
+    ConvertidorFormatos.guardar_conversion(_archivo_a(ruta, formato), str(destino))
+    return str(destino)
 
 
 class ConvertidorFormatos:
     """Clase para convertir entre formatos de configuración"""
 
     @staticmethod
-    def json_a_yaml(datos_json: Union[str, dict]) -> str:
+    def parsear(datos: Union[str, bytes, dict], formato: str) -> Any:
+        """
+        Parsea un string JSON, YAML o TOML; los objetos Python se devuelven tal cual
+
+        Útil para encadenar conversiones: parsear una vez y pasar el
+        diccionario a varios X_a_Y evita repetir parse y serialización.
+
+        Args:
+            datos: String o bytes en el formato indicado o diccionario Python
+            formato: Formato del string ('json', 'yaml' o 'toml')
+
+        Returns:
+            Objeto Python
+        """
+        return _asegurar_datos(datos, formato)
+
+    @staticmethod
+    def convertir(datos: Union[str, bytes, dict], origen: str, destino: str) -> str:
+        """
+        Convierte entre dos formatos cualesquiera ('json', 'yaml' o 'toml')
+
+        Si los datos ya son un string en el formato de destino se devuelven
+        sin parsear: se asume que el texto de entrada es válido.
+
+        Args:
+            datos: String o bytes en el formato de origen o diccionario Python
+            origen: Formato de entrada
+            destino: Formato de salida
+
+        Returns:
+            String en el formato de destino
+        """
+        if destino not in _SERIALIZADORES:
+            raise ValueError(f"Formato no soportado: {destino}")
+        if origen == destino and isinstance(datos, (str, bytes)):
+            return datos if isinstance(datos, str) else datos.decode('utf-8')
+        return _convertir(datos, origen, destino)
+
+    @staticmethod
+    def json_a_yaml(datos_json: Union[str, bytes, dict]) -> str:
         """
         Convierte JSON a YAML
 
         Args:
-            datos_json: String JSON o diccionario Python
+            datos_json: String o bytes JSON, o diccionario Python
 
         Returns:
             String en formato YAML
         """
-        if isinstance(datos_json, str):
-            datos = json.loads(datos_json)
-        else:
-            datos = datos_json
-
-        return yaml.dump(datos, default_flow_style=False, allow_unicode=True)
+        return _convertir(datos_json, 'json', 'yaml')
 
     @staticmethod
-    def yaml_a_json(datos_yaml: Union[str, dict]) -> str:
+    def yaml_a_json(datos_yaml: Union[str, bytes, dict]) -> str:
         """
         Convierte YAML a JSON
 
         Args:
-            datos_yaml: String YAML o diccionario Python
+            datos_yaml: String o bytes YAML, o diccionario Python
 
         Returns:
             String en formato JSON formateado
         """
-        if isinstance(datos_yaml, str):
-            datos = yaml.safe_load(datos_yaml)
-        else:
-            datos = datos_yaml
-
-        return json.dumps(datos, indent=2, ensure_ascii=False)
+        return _convertir(datos_yaml, 'yaml', 'json')
 
     @staticmethod
-    def json_a_toml(datos_json: Union[str, dict]) -> str:
+    def json_a_toml(datos_json: Union[str, bytes, dict]) -> str:
         """
         Convierte JSON a TOML
 
         Args:
-            datos_json: String JSON o diccionario Python
+            datos_json: String o bytes JSON, o diccionario Python
 
         Returns:
             String en formato TOML
         """
-        if isinstance(datos_json, str):
-            datos = json.loads(datos_json)
-        else:
-            datos = datos_json
-
-        return toml.dumps(datos)
+        return _convertir(datos_json, 'json', 'toml')
 
     @staticmethod
-    def toml_a_json(datos_toml: Union[str, dict]) -> str:
+    def toml_a_json(datos_toml: Union[str, bytes, dict]) -> str:
         """
         Convierte TOML a JSON
 
         Args:
-            datos_toml: String TOML o diccionario Python
+            datos_toml: String o bytes TOML, o diccionario Python
 
         Returns:
             String en formato JSON formateado
         """
-        if isinstance(datos_toml, str):
-            datos = toml.loads(datos_toml)
-        else:
-            datos = datos_toml
-
-        return json.dumps(datos, indent=2, ensure_ascii=False)
+        return _convertir(datos_toml, 'toml', 'json')
 
     @staticmethod
-    def yaml_a_toml(datos_yaml: Union[str, dict]) -> str:
+    def yaml_a_toml(datos_yaml: Union[str, bytes, dict]) -> str:
         """
         Convierte YAML a TOML
 
         Args:
-            datos_yaml: String YAML o diccionario Python
+            datos_yaml: String o bytes YAML, o diccionario Python
 
         Returns:
             String en formato TOML
         """
-        if isinstance(datos_yaml, str):
-            datos = yaml.safe_load(datos_yaml)
-        else:
-            datos = datos_yaml
-
-        return toml.dumps(datos)
+        return _convertir(datos_yaml, 'yaml', 'toml')
 
     @staticmethod
-    def toml_a_yaml(datos_toml: Union[str, dict]) -> str:
+    def toml_a_yaml(datos_toml: Union[str, bytes, dict]) -> str:
         """
         Convierte TOML a YAML
 
         Args:
-            datos_toml: String TOML o diccionario Python
+            datos_toml: String o bytes TOML, o diccionario Python
 
         Returns:
             String en formato YAML
         """
-        if isinstance(datos_toml, str):
-            datos = toml.loads(datos_toml)
-        else:
-            datos = datos_toml
-
-        return yaml.dump(datos, default_flow_style=False, allow_unicode=True)
+        return _convertir(datos_toml, 'toml', 'yaml')
 
     @staticmethod
-    def archivo_a_json(ruta: str) -> str:
+    def archivo_a_json(ruta: str, preservar: bool = False) -> str:
         """
         Lee un archivo (JSON, YAML o TOML) y lo convierte a JSON
 
         Args:
             ruta: Ruta del archivo
+            preservar: Si el archivo ya es JSON, devolverlo sin reformatear
 
         Returns:
             String en formato JSON
         """
-        ruta_path = Path(ruta)
-        extension = ruta_path.suffix.lower()
-        contenido = ruta_path.read_text(encoding='utf-8')
-
-        if extension == '.json':
-            datos = json.loads(contenido)
-        elif extension in ['.yaml', '.yml']:
-            datos = yaml.safe_load(contenido)
-        elif extension == '.toml':
-            datos = toml.loads(contenido)
-        else:
-            raise ValueError(f"Formato no soportado: {extension}")
-
-        return json.dumps(datos, indent=2, ensure_ascii=False)
+        return _archivo_a(ruta, 'json', preservar)
 
     @staticmethod
-    def archivo_a_yaml(ruta: str) -> str:
+    def archivo_a_yaml(ruta: str, preservar: bool = False) -> str:
         """
         Lee un archivo (JSON, YAML o TOML) y lo convierte a YAML
 
         Args:
             ruta: Ruta del archivo
+            preservar: Si el archivo ya es YAML, devolverlo sin reformatear
 
         Returns:
             String en formato YAML
         """
-        ruta_path = Path(ruta)
-        extension = ruta_path.suffix.lower()
-        contenido = ruta_path.read_text(encoding='utf-8')
-
-        if extension == '.json':
-            datos = json.loads(contenido)
-        elif extension in ['.yaml', '.yml']:
-            datos = yaml.safe_load(contenido)
-        elif extension == '.toml':
-            datos = toml.loads(contenido)
-        else:
-            raise ValueError(f"Formato no soportado: {extension}")
-
-        return yaml.dump(datos, default_flow_style=False, allow_unicode=True)
+        return _archivo_a(ruta, 'yaml', preservar)
 
     @staticmethod
-    def archivo_a_toml(ruta: str) -> str:
+    def archivo_a_toml(ruta: str, preservar: bool = False) -> str:
         """
         Lee un archivo (JSON, YAML o TOML) y lo convierte a TOML
 
         Args:
             ruta: Ruta del archivo
+            preservar: Si el archivo ya es TOML, devolverlo sin reformatear
 
         Returns:
             String en formato TOML
         """
-        ruta_path = Path(ruta)
-        extension = ruta_path.suffix.lower()
-        contenido = ruta_path.read_text(encoding='utf-8')
+        return _archivo_a(ruta, 'toml', preservar)
 
-        if extension == '.json':
-            datos = json.loads(contenido)
-        elif extension in ['.yaml', '.yml']:
-            datos = yaml.safe_load(contenido)
-        elif extension == '.toml':
-            datos = toml.loads(contenido)
-        else:
-            raise ValueError(f"Formato no soportado: {extension}")
+    @staticmethod
+    async def archivo_a_json_async(ruta: str, preservar: bool = False) -> str:
+        """
+        Versión asíncrona de archivo_a_json: lee y parsea en un hilo
 
-        return toml.dumps(datos)
+        Args:
+            ruta: Ruta del archivo
+            preservar: Si el archivo ya es JSON, devolverlo sin reformatear
+
+        Returns:
+            String en formato JSON
+        """
+        return await asyncio.to_thread(_archivo_a, ruta, 'json', preservar)
+
+    @staticmethod
+    async def archivo_a_yaml_async(ruta: str, preservar: bool = False) -> str:
+        """
+        Versión asíncrona de archivo_a_yaml: lee y parsea en un hilo
+
+        Args:
+            ruta: Ruta del archivo
+            preservar: Si el archivo ya es YAML, devolverlo sin reformatear
+
+        Returns:
+            String en formato YAML
+        """
+        return await asyncio.to_thread(_archivo_a, ruta, 'yaml', preservar)
+
+    @staticmethod
+    async def archivo_a_toml_async(ruta: str, preservar: bool = False) -> str:
+        """
+        Versión asíncrona de archivo_a_toml: lee y parsea en un hilo
+
+        Args:
+            ruta: Ruta del archivo
+            preservar: Si el archivo ya es TOML, devolverlo sin reformatear
+
+        Returns:
+            String en formato TOML
+        """
+        return await asyncio.to_thread(_archivo_a, ruta, 'toml', preservar)
+
+    @staticmethod
+    def limpiar_cache() -> None:
+        """Vacía la caché de conversiones de texto (str/bytes)"""
+        _convertir_texto.cache_clear()
 
     @staticmethod
     def guardar_conversion(contenido: str, ruta_salida: str) -> None:
@@ -207,38 +679,108 @@ class ConvertidorFormatos:
             contenido: Contenido a guardar
             ruta_salida: Ruta del archivo de salida
         """
-        Path(ruta_salida).write_text(contenido, encoding='utf-8')
+        _escribir_bytes(ruta_salida, contenido.encode('utf-8'))
+
+    @staticmethod
+    def guardar_bytes(contenido: bytes, ruta_salida: str) -> None:
+        """
+        Guarda contenido ya codificado (p. ej. la salida de orjson.dumps)
 
+        Args:
+            contenido: Bytes a guardar
+            ruta_salida: Ruta del archivo de salida
+        """
+        _escribir_bytes(ruta_salida, contenido)
 
-# Funciones de conveniencia directa
-def json_a_yaml(datos: Union[str, dict]) -> str:
-    """Convierte JSON a YAML"""
-    return ConvertidorFormatos.json_a_yaml(datos)
+    @staticmethod
+    def convertir_archivos(
+        rutas: Iterable[str],
+        destino_fmt: str,
+        directorio_salida: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Convierte varios archivos en paralelo, uno por proceso
 
+        Cada archivo se guarda con la extensión del formato de destino,
+        junto al original o en directorio_salida.
 
-def yaml_a_json(datos: Union[str, dict]) -> str:
-    """Convierte YAML a JSON"""
-    return ConvertidorFormatos.yaml_a_json(datos)
+        Args:
+            rutas: Rutas de los archivos de entrada (JSON, YAML o TOML)
+            destino_fmt: Formato de salida ('json', 'yaml' o 'toml')
+            directorio_salida: Directorio donde escribir los resultados
+            max_workers: Número de procesos (por defecto, os.cpu_count())
 
+        Returns:
+            Rutas de los archivos generados, en el mismo orden que la entrada
 
-def json_a_toml(datos: Union[str, dict]) -> str:
-    """Convierte JSON a TOML"""
-    return ConvertidorFormatos.json_a_toml(datos)
+        Raises:
+            ValueError: Si el formato no está soportado o algún archivo ya
+                tiene la extensión de destino y se escribiría sobre sí mismo
+        """
+        if destino_fmt not in _SERIALIZADORES:
+            raise ValueError(f"Formato no soportado: {destino_fmt}")
 
+        convertir_uno = partial(
+            _convertir_uno, formato=destino_fmt, directorio_salida=directorio_salida
+        )
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            # Lotes de 16 para amortizar la comunicación entre procesos con archivos pequeños
+            return list(executor.map(convertir_uno, rutas, chunksize=16))
 
-def toml_a_json(datos: Union[str, dict]) -> str:
-    """Convierte TOML a JSON"""
-    return ConvertidorFormatos.toml_a_json(datos)
+    @staticmethod
+    async def convertir_archivos_async(
+        rutas: Iterable[str],
+        destino_fmt: str,
+        directorio_salida: Optional[str] = None,
+        max_concurrencia: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Convierte varios archivos solapando la lectura de unos con el parseo de otros
 
+        Cada archivo se procesa en un hilo (asyncio.to_thread); los parsers
+        en C liberan el GIL, así que la E/S de un archivo avanza mientras
+        se parsea otro. Alternativa a convertir_archivos sin crear procesos.
 
-def yaml_a_toml(datos: Union[str, dict]) -> str:
-    """Convierte YAML a TOML"""
-    return ConvertidorFormatos.yaml_a_toml(datos)
+        Args:
+            rutas: Rutas de los archivos de entrada (JSON, YAML o TOML)
+            destino_fmt: Formato de salida ('json', 'yaml' o 'toml')
+            directorio_salida: Directorio donde escribir los resultados
+            max_concurrencia: Archivos en curso a la vez (por defecto, 2 por CPU)
 
+        Returns:
+            Rutas de los archivos generados, en el mismo orden que la entrada
 
-def toml_a_yaml(datos: Union[str, dict]) -> str:
-    """Convierte TOML a YAML"""
-    return ConvertidorFormatos.toml_a_yaml(datos)
+        Raises:
+            ValueError: Si el formato no está soportado o algún archivo ya
+                tiene la extensión de destino y se escribiría sobre sí mismo
+        """
+        if destino_fmt not in _SERIALIZADORES:
+            raise ValueError(f"Formato no soportado: {destino_fmt}")
+
+        semaforo = asyncio.Semaphore(max_concurrencia or (os.cpu_count() or 1) * 2)
+
+        async def convertir_uno(ruta: str) -> str:
+            async with semaforo:
+                return await asyncio.to_thread(
+                    _convertir_uno, ruta, destino_fmt, directorio_salida
+                )
+
+        return list(await asyncio.gather(*(convertir_uno(ruta) for ruta in rutas)))
+
+
+# Funciones de conveniencia directa: alias de los métodos estáticos, sin
+# una llamada intermedia
+json_a_yaml = ConvertidorFormatos.json_a_yaml
+yaml_a_json = ConvertidorFormatos.yaml_a_json
+json_a_toml = ConvertidorFormatos.json_a_toml
+toml_a_json = ConvertidorFormatos.toml_a_json
+yaml_a_toml = ConvertidorFormatos.yaml_a_toml
+toml_a_yaml = ConvertidorFormatos.toml_a_yaml
+convertir = ConvertidorFormatos.convertir
+convertir_archivos = ConvertidorFormatos.convertir_archivos
+convertir_archivos_async = ConvertidorFormatos.convertir_archivos_async
+limpiar_cache = ConvertidorFormatos.limpiar_cache
 
 
 if __name__ == '__main__':